@@ -0,0 +1,3 @@
+from report_frontends import compare_page
+
+compare_page()
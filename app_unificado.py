@@ -0,0 +1,12 @@
+import streamlit as st
+
+from report_frontends import compare_page, embed_page, prefetch_page, viewer_page
+
+# Todas as interfaces num único processo: um só cache, pool de conexões e
+# template compilado, em vez de uma cópia por app publicado.
+st.navigation([
+    st.Page(viewer_page, title="Visualizador", icon="📄", url_path="visualizador", default=True),
+    st.Page(embed_page, title="Relatório e PDF", icon="🖨️", url_path="relatorio"),
+    st.Page(compare_page, title="Comparar", icon="📊", url_path="comparar"),
+    st.Page(prefetch_page, title="Agenda do Dia", icon="⏱️", url_path="agenda"),
+]).run()
@@ -0,0 +1,87 @@
+"""Cache dos artefatos prontos (HTML e PDF) de cada versão de um relatório.
+
+Mesmo com os dados em cache, cada visualização remontava o HTML e cada
+download redesenhava o PDF inteiro. Aqui ficam os bytes finais, numa chave
+que só muda quando muda o resultado: ID do relatório, versão dos dados
+(SHA-256 da resposta da API), versão do template/layout, idioma, variante e
+janela do histórico. Como a chave já carrega a versão, as entradas não expiram
+por tempo; saem só por limite de espaço.
+
+São dois níveis, como nas respostas da API: memória do processo
+(``ReportCache``) e disco (``DiskCache``, em outro diretório), que sobrevive a
+reinícios e é compartilhado entre processos da mesma máquina.
+"""
+import os
+
+import metrics
+from disk_cache import BASE_DIR, DiskCache
+from report_cache import ReportCache
+
+# --- CONFIGURAÇÃO (sobrescrevível por variáveis de ambiente) ---
+ARTIFACT_CACHE_MAX_ENTRIES = int(os.environ.get("REPORT_ARTIFACT_CACHE_MAX_ENTRIES", 256))
+ARTIFACT_CACHE_MAX_BYTES = int(os.environ.get("REPORT_ARTIFACT_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+# REPORT_ARTIFACT_CACHE_DIR="" desliga o nível em disco
+ARTIFACT_DISK_DIR = os.environ.get("REPORT_ARTIFACT_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "artefatos"))
+ARTIFACT_DISK_MAX_BYTES = int(os.environ.get("REPORT_ARTIFACT_DISK_MAX_BYTES", 512 * 1024 * 1024))
+
+
+def artifact_key(kind, report_id, version, *variant):
+    """Chave de um artefato: tipo, relatório, versão dos dados e o que mais mudar o resultado."""
+    return "|".join(str(part) for part in (kind, report_id, version, *variant))
+
+
+class ArtifactCache:
+    """Bytes prontos por chave, na memória e (opcionalmente) em disco."""
+
+    def __init__(self, memory, disk=None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key, kind="artefato"):
+        content = self.memory.get(key)
+        if content is not None:
+            metrics.ARTIFACT_REQUESTS.inc(kind=kind, result="memory")
+            return content
+        stored = self._disk("get", key, kind=kind)
+        if stored is not None:
+            metrics.ARTIFACT_REQUESTS.inc(kind=kind, result="disk")
+            self.memory.put(key, stored.body, len(stored.body))
+            return stored.body
+        metrics.ARTIFACT_REQUESTS.inc(kind=kind, result="miss")
+        return None
+
+    def put(self, key, content, kind="artefato"):
+        self.memory.put(key, content, len(content))
+        self._disk("put", key, content, kind=kind)
+
+    def get_or_render(self, key, render, kind="artefato"):
+        """Artefato em cache ou ``render()`` (que é guardado para as próximas vezes)."""
+        content = self.get(key, kind)
+        if content is None:
+            content = render()
+            self.put(key, content, kind)
+        return content
+
+    def clear(self):
+        self.memory.clear()
+        self._disk("clear")
+
+    def stats(self):
+        return {"memory": self.memory.stats(), "disk": self.disk.stats() if self.disk else None}
+
+    def _disk(self, method, *args, kind="artefato"):
+        """Falhas de E/S no disco só perdem o cache, não o relatório."""
+        if self.disk is None:
+            return None
+        try:
+            return getattr(self.disk, method)(*args)
+        except OSError:
+            metrics.ARTIFACT_REQUESTS.inc(kind=kind, result="disk_error")
+            return None
+
+
+# Instância única do processo
+artifact_cache = ArtifactCache(
+    ReportCache(ttl=float("inf"), max_entries=ARTIFACT_CACHE_MAX_ENTRIES, max_bytes=ARTIFACT_CACHE_MAX_BYTES),
+    DiskCache(ARTIFACT_DISK_DIR, ARTIFACT_DISK_MAX_BYTES) if ARTIFACT_DISK_DIR else None,
+)
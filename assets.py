@@ -0,0 +1,178 @@
+"""Imagens estáticas do relatório (logoTKE.png, corpo.png) carregadas uma vez por processo.
+
+Cada arquivo é lido e codificado só na primeira vez; nas seguintes basta um
+``os.stat``. Se o mtime/tamanho mudar, o conteúdo é relido e as variantes só
+são descartadas se o hash SHA-256 também mudou. Com Pillow disponível, as
+imagens podem ser servidas como variantes otimizadas (reduzidas e/ou WebP
+sem perdas), também calculadas uma única vez.
+
+As variantes também podem ser publicadas em ``static/`` (servido pelo
+Streamlit em ``/app/static`` com ``server.enableStaticServing``) com o hash do
+conteúdo no nome: o HTML passa a referenciar uma URL estável em vez de
+carregar a imagem em base64 a cada relatório, e o navegador baixa cada versão
+uma única vez.
+"""
+import base64
+import hashlib
+import io
+import os
+import threading
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow é opcional: sem ele, servimos o arquivo original
+    Image = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, "static")
+# Prefixo público de STATIC_DIR; absoluto para funcionar também na aba aberta via blob:
+STATIC_URL = os.environ.get("REPORT_STATIC_URL", "/app/static").rstrip("/")
+# "static" (padrão) publica os arquivos em STATIC_DIR; "inline" volta aos data: URIs
+ASSETS_MODE = os.environ.get("REPORT_ASSETS", "static")
+
+MIME_TYPES = {
+    ".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp",
+    ".woff2": "font/woff2", ".woff": "font/woff", ".ttf": "font/ttf",
+}
+EXTENSIONS = {mime: ext for ext, mime in reversed(MIME_TYPES.items())}
+
+
+class _Asset:
+    __slots__ = ("stat", "digest", "content", "mime", "variants")
+
+    def __init__(self, stat, digest, content, mime):
+        self.stat = stat
+        self.digest = digest
+        self.content = content
+        self.mime = mime
+        self.variants = {}
+
+
+class AssetStore:
+    """Cache de arquivos estáticos invalidado por mtime + hash do conteúdo."""
+
+    def __init__(self, base_dir=BASE_DIR):
+        self.base_dir = base_dir
+        self._assets = {}
+        self._lock = threading.Lock()
+
+    def path(self, name):
+        return name if os.path.isabs(name) else os.path.join(self.base_dir, name)
+
+    def get(self, name):
+        """Retorna o asset atualizado ou ``None`` se o arquivo não existe."""
+        path = self.path(name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            asset = self._assets.get(path)
+            if asset is not None and asset.stat == key:
+                return asset
+            with open(path, "rb") as fp:
+                content = fp.read()
+            digest = hashlib.sha256(content).hexdigest()
+            if asset is not None and asset.digest == digest:
+                asset.stat = key  # só o mtime mudou: mantém as variantes já calculadas
+                return asset
+            mime = MIME_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+            asset = _Asset(key, digest, content, mime)
+            self._assets[path] = asset
+            return asset
+
+    def variant(self, name, max_height=None, webp=False):
+        """Bytes e MIME de uma variante (reduzida/WebP); sem Pillow, o original."""
+        asset = self.get(name)
+        if asset is None:
+            return None, None
+        if Image is None or (max_height is None and not webp):
+            return asset.content, asset.mime
+        key = (max_height, webp)
+        with self._lock:
+            if key not in asset.variants:
+                asset.variants[key] = self._encode(asset, max_height, webp)
+            return asset.variants[key]
+
+    def data_uri(self, name, max_height=None, webp=False):
+        """``data:`` URI da variante pedida, codificado uma única vez por processo."""
+        asset = self.get(name)
+        if asset is None:
+            return ""
+        key = ("uri", max_height, webp)
+        with self._lock:
+            uri = asset.variants.get(key)
+        if uri is None:
+            content, mime = self.variant(name, max_height, webp)
+            uri = f"data:{mime};base64,{base64.b64encode(content).decode()}"
+            with self._lock:
+                asset.variants[key] = uri
+        return uri
+
+    def publish(self, name, max_height=None, webp=False, static_dir=STATIC_DIR):
+        """Grava a variante em ``static_dir`` com nome ``<nome>.<hash>.<ext>`` e devolve o nome.
+
+        O arquivo só é escrito se ainda não existir; como o nome muda junto com o
+        conteúdo, ele pode ser servido com cache imutável.
+        """
+        asset = self.get(name)
+        if asset is None:
+            return None
+        key = ("static", max_height, webp, static_dir)
+        with self._lock:
+            filename = asset.variants.get(key)
+        if filename is None:
+            content, mime = self.variant(name, max_height, webp)
+            stem = os.path.splitext(os.path.basename(name))[0]
+            filename = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{EXTENSIONS.get(mime, '')}"
+            path = os.path.join(static_dir, filename)
+            if not os.path.exists(path):
+                os.makedirs(static_dir, exist_ok=True)
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as fp:
+                    fp.write(content)
+                os.replace(tmp, path)  # atômico: nunca serve um arquivo pela metade
+            with self._lock:
+                asset.variants[key] = filename
+        return filename
+
+    @staticmethod
+    def _encode(asset, max_height, webp):
+        image = Image.open(io.BytesIO(asset.content))
+        if max_height and image.height > max_height:
+            image = image.resize((round(image.width * max_height / image.height), max_height), Image.LANCZOS)
+        buffer = io.BytesIO()
+        if webp:
+            image.save(buffer, "WEBP", lossless=True, method=6)
+            return buffer.getvalue(), "image/webp"
+        image.save(buffer, "PNG", optimize=True)
+        return buffer.getvalue(), "image/png"
+
+
+# Instância única do processo
+asset_store = AssetStore()
+
+
+def data_uri(image_path, max_height=None, webp=True):
+    """URI da imagem otimizada (WebP sem perdas quando o Pillow está disponível)."""
+    return asset_store.data_uri(image_path, max_height=max_height, webp=webp)
+
+
+def static_url(name, max_height=None, webp=False, inline=True):
+    """URL do arquivo publicado em ``static/``; ``data:`` URI se não der para publicar.
+
+    Com ``inline=False`` (fontes, pesadas demais para ir em base64 em cada
+    relatório), devolve ``""`` em vez do ``data:`` URI. Também devolve ``""``
+    se o arquivo de origem não existe.
+    """
+    if ASSETS_MODE != "inline":
+        try:
+            filename = asset_store.publish(name, max_height=max_height, webp=webp)
+        except OSError:  # diretório somente leitura: cai para o data: URI
+            pass
+        else:
+            return f"{STATIC_URL}/{filename}" if filename else ""
+    if not inline:
+        return ""
+    return asset_store.data_uri(name, max_height=max_height, webp=webp)
@@ -0,0 +1,535 @@
+"""Cliente HTTP compartilhado para a API da balança (balancaapi.avanutrionline.com).
+
+Uma única ``requests.Session`` por processo mantém o pool de conexões com
+keep-alive, evitando um handshake TCP+TLS por relatório. Todas as chamadas têm
+timeout de conexão/leitura, retentativas com backoff exponencial limitadas por
+um orçamento global e um disjuntor (circuit breaker) que falha rápido enquanto
+a API está degradada.
+
+Respostas ficam em dois níveis de cache: a memória do processo
+(``report_cache``) e o disco (``disk_cache``), que sobrevive a reinícios e é
+revalidado com ETag/Last-Modified quando envelhece. Buscas simultâneas do
+mesmo relatório (um link compartilhado aberto por várias sessões ao mesmo
+tempo) se juntam numa só ida ao disco/API (``SingleFlight``).
+
+``fetch_report`` devolve um ``Fetched`` com a situação dos dados:
+
+- ``FRESH``: dentro da validade ou recém-confirmados pela API;
+- ``REVALIDATING``: cópia vencida (da memória, até ``REPORT_CACHE_STALE``, ou
+  do disco) servida na hora, enquanto a API é consultada em segundo plano
+  (stale-while-revalidate);
+- ``STALE``: a API falhou e saiu a última cópia guardada, que pode estar
+  desatualizada (a interface avisa);
+- ``NOT_FOUND``: ID inválido ou inexistente (404), lembrado por um tempo curto;
+- ``UNAVAILABLE``: a API falhou e não há cópia guardada.
+
+``iter_fetch`` busca vários relatórios em paralelo (asyncio + semáforo) sobre o
+mesmo ``fetch_data``, ou seja, com o mesmo cache e o mesmo pool de conexões.
+"""
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import metrics
+from disk_cache import DISK_CACHE_FRESH_SECONDS, DISK_CACHE_STALE_SECONDS, disk_cache
+from report_cache import CACHE_ERROR_TTL_SECONDS, CACHE_NEGATIVE_TTL_SECONDS, report_cache
+from report_model import parse_report
+
+# --- CONFIGURAÇÃO (sobrescrevível por variáveis de ambiente) ---
+API_BASE_URL = os.environ.get("BALANCA_API_URL", "https://balancaapi.avanutrionline.com")
+CONNECT_TIMEOUT = float(os.environ.get("BALANCA_CONNECT_TIMEOUT", 3.05))
+READ_TIMEOUT = float(os.environ.get("BALANCA_READ_TIMEOUT", 15))
+POOL_MAXSIZE = int(os.environ.get("BALANCA_POOL_MAXSIZE", 32))
+MAX_RETRIES = int(os.environ.get("BALANCA_MAX_RETRIES", 2))
+BACKOFF_BASE = float(os.environ.get("BALANCA_BACKOFF_BASE", 0.2))
+BACKOFF_MAX = float(os.environ.get("BALANCA_BACKOFF_MAX", 2.0))
+RETRY_BUDGET_RATIO = float(os.environ.get("BALANCA_RETRY_BUDGET_RATIO", 0.2))
+RETRY_BUDGET_MAX = float(os.environ.get("BALANCA_RETRY_BUDGET_MAX", 10))
+BREAKER_THRESHOLD = int(os.environ.get("BALANCA_BREAKER_THRESHOLD", 5))
+BREAKER_RESET_SECONDS = float(os.environ.get("BALANCA_BREAKER_RESET", 30))
+MAX_CONCURRENCY = int(os.environ.get("BALANCA_MAX_CONCURRENCY", 10))
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+NOT_FOUND_STATUS = {400, 404, 410}  # o ID não existe: não adianta repetir nem servir cópia antiga
+
+# Situação dos dados de ``fetch_report``
+FRESH = "fresh"
+REVALIDATING = "revalidating"
+STALE = "stale"
+NOT_FOUND = "not_found"
+UNAVAILABLE = "unavailable"
+
+# O ID vai no caminho da URL: barra, "?", "#" ou espaço levariam a outra rota da API
+_VALID_ID = re.compile(r"^[^\s/?#%\\]{1,128}$")
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Disjuntor aberto: a API está degradada e a chamada nem foi feita."""
+
+
+class RetryBudget:
+    """Orçamento global de retentativas (token bucket).
+
+    Cada requisição nova deposita ``ratio`` fichas e cada retentativa consome
+    uma; assim as retentativas ficam limitadas a ~``ratio`` do tráfego e não
+    multiplicam a carga numa queda da API.
+    """
+
+    def __init__(self, ratio=RETRY_BUDGET_RATIO, max_tokens=RETRY_BUDGET_MAX):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self):
+        """Consome uma ficha; retorna ``False`` se o orçamento acabou."""
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class CircuitBreaker:
+    """Disjuntor fechado/aberto/meio-aberto por falhas consecutivas."""
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        """Indica se uma chamada pode seguir (no meio-aberto, só uma de teste)."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+
+
+class SingleFlight:
+    """Uma execução por chave em andamento; chamadas simultâneas esperam e compartilham o resultado.
+
+    Quem chega enquanto ``do(chave, fn)`` roda não chama ``fn``: recebe o mesmo
+    valor ou a mesma exceção da chamada em andamento.
+    """
+
+    class _Call:
+        __slots__ = ("done", "result", "error")
+
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """``(resultado de fn(), compartilhado)``; ``compartilhado`` é ``True`` para quem só esperou."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+# --- CONEXÕES CRONOMETRADAS ---
+# Conexões novas registram ``fetch.connect`` (DNS + TCP) e, em HTTPS, ``fetch.tls``;
+# conexões reaproveitadas do pool não passam por aqui.
+
+class _TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self):
+        with metrics.span("fetch.connect"):
+            return super()._new_conn()
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self):
+        started = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            self._tcp_seconds = time.perf_counter() - started
+            metrics.observe_stage("fetch.connect", self._tcp_seconds)
+
+    def connect(self):
+        self._tcp_seconds = 0.0
+        started = time.perf_counter()
+        super().connect()
+        metrics.observe_stage("fetch.tls", time.perf_counter() - started - self._tcp_seconds)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+
+
+def _error_kind(exc):
+    if isinstance(exc, requests.exceptions.Timeout):
+        return "timeout"
+    if isinstance(exc, requests.exceptions.HTTPError) and exc.response is not None:
+        return f"http_{exc.response.status_code}"
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        return "connection"
+    return "body" if isinstance(exc, (requests.exceptions.ChunkedEncodingError,
+                                      requests.exceptions.ContentDecodingError)) else "request"
+
+
+class BalancaClient:
+    """Cliente com pool de conexões, timeouts, retentativas e disjuntor."""
+
+    def __init__(self, base_url=API_BASE_URL, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), max_retries=MAX_RETRIES):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.budget = RetryBudget()
+        self.breaker = CircuitBreaker()
+        self.session = requests.Session()
+        # Retentativas ficam por nossa conta (com orçamento); o adapter não repete sozinho
+        adapter = _TimedAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, path, headers=None):
+        """GET com retentativas; levanta ``requests.RequestException`` em caso de falha.
+
+        Com um trace ativo (``metrics.trace``), o ID segue para a API em ``X-Request-ID``.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        trace_id = metrics.current_trace_id()
+        if trace_id:
+            headers = {**(headers or {}), "X-Request-ID": trace_id}
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                metrics.UPSTREAM_ERRORS.inc(kind="circuit_open")
+                raise CircuitOpenError(f"API da balança indisponível (disjuntor aberto): {url}")
+            try:
+                # stream=True separa o tempo até o primeiro byte da leitura do corpo
+                with metrics.span("fetch.ttfb"):
+                    response = self.session.get(url, timeout=self.timeout, headers=headers, stream=True)
+                with metrics.span("fetch.body"):
+                    response.content
+                metrics.UPSTREAM_REQUESTS.inc(status=response.status_code)
+                if response.status_code in RETRY_STATUS:
+                    response.raise_for_status()
+            except requests.exceptions.RequestException as exc:  # inclui corpo truncado/mal codificado
+                metrics.UPSTREAM_ERRORS.inc(kind=_error_kind(exc))
+                self.breaker.record_failure()
+                if attempt >= self.max_retries or not self.budget.withdraw():
+                    raise
+                attempt += 1
+                time.sleep(random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt)))
+                continue
+            except BaseException:
+                # Qualquer outra saída também encerra a chamada de teste do meio-aberto
+                self.breaker.record_failure()
+                raise
+            self.breaker.record_success()
+            response.raise_for_status()
+            return response
+
+
+class Fetched:
+    """Resultado de ``fetch_report`` (compartilhado pelo cache: não alterar).
+
+    ``data`` é o ``report_model.Relatorio`` (``None`` em ``NOT_FOUND``/``UNAVAILABLE``);
+    ``version`` é o SHA-256 do corpo da resposta: muda só quando o conteúdo muda
+    (uma revalidação 304 mantém a mesma), e serve de chave para o que é derivado
+    dos dados, como o HTML e o PDF prontos. ``fetched_at`` (epoch) é quando a
+    API entregou ou confirmou esses dados, e ``size`` o tamanho da resposta
+    (o que a entrada ocupa no limite de bytes do cache).
+    """
+
+    __slots__ = ("data", "version", "status", "fetched_at", "size")
+
+    def __init__(self, data, version, status=FRESH, fetched_at=None, size=0):
+        self.data = data
+        self.version = version
+        self.status = status
+        self.fetched_at = fetched_at
+        self.size = size
+
+    def __repr__(self):
+        return f"Fetched(status={self.status!r}, version={self.version!r})"
+
+
+# Cliente único do processo, usado pelos três apps
+client = BalancaClient()
+_flights = SingleFlight()
+_refreshing = set()  # IDs com atualização em segundo plano agendada ou em andamento
+_refreshing_lock = threading.Lock()
+
+
+def fetch_data(report_id, trace_id=None):
+    """Busca os dados do relatório (``report_model.Relatorio``) com cache e cliente compartilhado.
+
+    ``None`` se não encontrado ou indisponível. ``trace_id`` (opcional)
+    identifica a requisição nos spans e na chamada à API.
+    """
+    return fetch_report(report_id, trace_id).data
+
+
+def fetch_report(report_id, trace_id=None):
+    """Como ``fetch_data``, mas devolve o ``Fetched`` (dados, versão e situação)."""
+    if trace_id is not None:
+        with metrics.trace(trace_id):
+            return fetch_report(report_id)
+    if not _VALID_ID.match(report_id or ""):
+        metrics.CACHE_REQUESTS.inc(result="invalid")
+        return Fetched(None, None, NOT_FOUND)
+    cached, expired = report_cache.lookup(report_id)
+    if cached is not None and not expired:
+        metrics.CACHE_REQUESTS.inc(result="hit" if cached.data is not None else "negative")
+        return cached
+    if cached is not None:
+        # Vencido na memória, ainda na janela REPORT_CACHE_STALE: sai na hora e é atualizado em segundo plano
+        metrics.CACHE_REQUESTS.inc(result="revalidating")
+        _schedule_refresh(report_id, cached)
+        status = STALE if cached.status == STALE else REVALIDATING
+        return Fetched(cached.data, cached.version, status, cached.fetched_at, cached.size)
+    with metrics.span("fetch.flight"):
+        fetched, shared = _flights.do(report_id, functools.partial(_load, report_id))
+    metrics.CACHE_REQUESTS.inc(result="coalesced" if shared else "miss")
+    return fetched
+
+
+def _load(report_id, refresh=False, previous=None):
+    """Disco e, se preciso, API (uma execução por ID por vez, via ``_flights``).
+
+    Com ``refresh`` (atualização em segundo plano), uma cópia vencida do disco
+    não é servida: a API é consultada na hora. ``previous`` é a cópia vencida
+    da memória, servida como ``STALE`` se a API falhar e não houver disco.
+    """
+    stored = _disk("get", report_id)
+    if stored is not None:
+        age = stored.age()
+        if age < DISK_CACHE_FRESH_SECONDS:
+            metrics.DISK_CACHE_REQUESTS.inc(result="hit")
+            return _remember(report_id, stored.body, stored.digest, fetched_at=stored.stored_at)
+        if not refresh and age < DISK_CACHE_FRESH_SECONDS + DISK_CACHE_STALE_SECONDS:
+            metrics.DISK_CACHE_REQUESTS.inc(result="revalidating")
+            fetched = _remember(report_id, stored.body, stored.digest, REVALIDATING, stored.stored_at)
+            _schedule_refresh(report_id)
+            return fetched
+    return _revalidate(report_id, stored, previous)
+
+
+def _schedule_refresh(report_id, previous=None):
+    """Agenda a atualização em segundo plano de um relatório servido vencido (uma por ID por vez).
+
+    ``previous``: a cópia vencida da memória, mantida (como ``STALE``) se a API falhar.
+    """
+    with _refreshing_lock:
+        if report_id in _refreshing:
+            return
+        _refreshing.add(report_id)
+    _executor.submit(_refresh, report_id, previous)
+
+
+def _refresh(report_id, previous):
+    try:
+        # Pelo _flights: uma falta simultânea no mesmo ID espera esta busca em vez de ir à API de novo
+        load = functools.partial(_load, report_id, refresh=True, previous=previous)
+        with metrics.trace(), metrics.span("fetch.refresh"):
+            fetched, shared = _flights.do(report_id, load)
+            if shared and fetched.status == REVALIDATING:
+                # Entrou na própria busca que agendou esta atualização (cópia vencida do disco)
+                _flights.do(report_id, load)
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(report_id)
+
+
+def _revalidate(report_id, stored, previous=None):
+    """Consulta a API (condicional, se houver cópia ``stored``) e atualiza os caches."""
+    try:
+        with metrics.span("fetch.total"):
+            response = client.get(f"Relatorio/{report_id}", headers=stored.validators() if stored else None)
+        if response.status_code == 304 and stored is not None:
+            # Os dados foram confirmados agora, não quando a cópia foi gravada
+            confirmed_at = time.time()
+            metrics.DISK_CACHE_REQUESTS.inc(result="revalidated")
+            _disk("touch", report_id, stored)
+            return _remember(report_id, stored.body, stored.digest, fetched_at=confirmed_at)
+        fetched = _remember(report_id, response.content)
+    except requests.exceptions.HTTPError as exc:
+        if exc.response is not None and exc.response.status_code in NOT_FOUND_STATUS:
+            _disk("remove", report_id)
+            return _forget(report_id, NOT_FOUND, CACHE_NEGATIVE_TTL_SECONDS)
+        return _fallback(report_id, stored, previous)
+    except (requests.exceptions.RequestException, ValueError):
+        return _fallback(report_id, stored, previous)
+    metrics.DISK_CACHE_REQUESTS.inc(result="stale" if stored is not None else "miss")
+    metrics.PAYLOAD_BYTES.observe(len(response.content), kind="api")
+    _disk("put", report_id, response.content,
+          etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+    return fetched
+
+
+def _fallback(report_id, stored, previous=None):
+    """API falhou: a última cópia guardada (``STALE``), se houver; senão ``UNAVAILABLE``.
+
+    A cópia vem do disco (``stored``) ou, sem ela, da memória (``previous``).
+    Todos ficam só ``CACHE_ERROR_TTL_SECONDS`` na memória, para tentar a API de novo logo.
+    """
+    if stored is None and previous is not None and previous.data is not None:
+        metrics.CACHE_REQUESTS.inc(result="stale_if_error")
+        fetched = Fetched(previous.data, previous.version, STALE, previous.fetched_at, previous.size)
+        report_cache.put(report_id, fetched, fetched.size, ttl=CACHE_ERROR_TTL_SECONDS)
+        return fetched
+    if stored is None:
+        return _forget(report_id, UNAVAILABLE, CACHE_ERROR_TTL_SECONDS)
+    metrics.DISK_CACHE_REQUESTS.inc(result="stale_if_error")
+    return _remember(report_id, stored.body, stored.digest, STALE, stored.stored_at, ttl=CACHE_ERROR_TTL_SECONDS)
+
+
+def _remember(report_id, body, digest=None, status=FRESH, fetched_at=None, ttl=None):
+    """Decodifica o JSON, monta o ``Relatorio`` e o guarda, com a versão, no cache em memória."""
+    with metrics.span("json_decode"):
+        raw = json.loads(body)
+    with metrics.span("parse"):
+        data = parse_report(raw)
+    fetched = Fetched(data, digest or hashlib.sha256(body).hexdigest(), status, fetched_at or time.time(), len(body))
+    report_cache.put(report_id, fetched, fetched.size, ttl=ttl)
+    return fetched
+
+
+def _forget(report_id, status, ttl):
+    """Cache negativo: lembra por ``ttl`` segundos que ``report_id`` não pôde ser carregado."""
+    fetched = Fetched(None, None, status, size=len(report_id))
+    report_cache.put(report_id, fetched, fetched.size, ttl=ttl, stale=0)
+    return fetched
+
+
+def _disk(method, *args, **kwargs):
+    """Chama o cache em disco; falhas de E/S não impedem o relatório (só perdem o cache)."""
+    if disk_cache is None:
+        return None
+    try:
+        return getattr(disk_cache, method)(*args, **kwargs)
+    except OSError:
+        metrics.DISK_CACHE_REQUESTS.inc(result="error")
+        return None
+
+
+# Threads dedicadas às buscas assíncronas e às revalidações em segundo plano: o
+# executor padrão do asyncio pode ter só cpu+4 threads e limitaria o paralelismo
+# abaixo do semáforo.
+_executor = ThreadPoolExecutor(max_workers=POOL_MAXSIZE, thread_name_prefix="balanca")
+
+
+async def fetch_data_async(report_id, fetch=fetch_data):
+    """``fetch`` (padrão ``fetch_data``) sem bloquear o event loop.
+
+    O trace ID atual vai junto para a thread.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, functools.partial(context.run, fetch, report_id))
+
+
+async def iter_fetch(report_ids, concurrency=MAX_CONCURRENCY, fetch=fetch_data):
+    """Busca os relatórios em paralelo (no máximo ``concurrency`` por vez).
+
+    Gera ``(report_id, dados)`` na ordem em que as respostas chegam; ``dados``
+    é ``None`` quando a busca falha, como em ``fetch_data``. Com
+    ``fetch=fetch_report``, ``dados`` é o ``Fetched``.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_one(report_id):
+        async with semaphore:
+            return report_id, await fetch_data_async(report_id, fetch)
+
+    tasks = [asyncio.ensure_future(fetch_one(report_id)) for report_id in dict.fromkeys(report_ids)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def extract_id_from_url(input_url):
+    """Extrai o ID após a hashtag # ou retorna o próprio input se não houver URL."""
+    if not input_url:
+        return ""
+    if "#" in input_url:
+        return input_url.split("#")[-1]
+    return input_url
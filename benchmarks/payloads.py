@@ -0,0 +1,68 @@
+"""Payloads da API (``/Relatorio/{id}``) para o benchmark.
+
+IDs ``sintetico-<n>`` geram um relatório determinístico com ``n`` avaliações.
+Qualquer outro ID é procurado em ``benchmarks/payloads/<id>.json`` (respostas
+reais gravadas, com dados anonimizados).
+"""
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+PAYLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads")
+
+BODY_KEYS = ("fmPercentual", "fm", "ffm", "ssm", "tbw", "icw", "ecw", "bmi", "indiceApendicular", "vfl")
+NORMALITY_KEYS = ("peso", "fmPerc", "fmKg", "ffmKg", "tbw", "bmi")
+
+
+def synthetic(count, seed=0):
+    """Relatório com ``count`` avaliações semanais, sempre igual para o mesmo ``seed``."""
+    rng = random.Random(seed * 100003 + count)
+    start = datetime(2020, 1, 6, 9, 30)
+    avaliacoes = []
+    peso = 82.0
+    for i in range(count):
+        peso += rng.uniform(-0.8, 0.6)
+        fm_percentual = rng.uniform(18, 34)
+        fm = peso * fm_percentual / 100
+        ffm = peso - fm
+        avaliacoes.append({
+            "data": (start + timedelta(weeks=i)).isoformat(),
+            "peso": round(peso, 2),
+            "taxaMetabolicaBasal": round(370 + 21.6 * ffm),
+            "idadeMetabolica": rng.randint(25, 55),
+            "dadosCorpo": {
+                "fmPercentual": round(fm_percentual, 2), "fm": round(fm, 2), "ffm": round(ffm, 2),
+                "ssm": round(ffm * 0.55, 2), "tbw": round(ffm * 0.73, 2), "icw": round(ffm * 0.45, 2),
+                "ecw": round(ffm * 0.28, 2), "bmi": round(peso / 1.72 ** 2, 2),
+                "indiceApendicular": round(rng.uniform(6, 9), 2), "vfl": rng.randint(3, 15),
+            },
+            "dadosMembros": [
+                {"composicaoCorporal": {"ffm": round(ffm * share, 2), "fm": round(fm * share, 2)}}
+                for share in (0.06, 0.06, 0.5, 0.19, 0.19)
+            ],
+        })
+    return {
+        "paciente": {
+            "nome": f"Paciente Sintético {count}", "sexo": 77, "estaturaCm": 172,
+            "dataNascimento": "1985-04-12T00:00:00", "email": "paciente@example.com",
+        },
+        "user": {
+            "nome": "Clínica Exemplo", "endereco": "Rua das Flores, 100", "complemento": "sala 3",
+            "cep": "90000-000", "municipio": "Porto Alegre", "uf": "RS",
+        },
+        "normalidades": {key: {"minimo": 10, "maximo": 30} for key in NORMALITY_KEYS},
+        "avaliacoes": avaliacoes,
+    }
+
+
+def load(report_id):
+    """Payload do ID, ou ``None`` se não houver (a API responderia 404)."""
+    prefix, _, count = report_id.rpartition("-")
+    if prefix == "sintetico" and count.isdigit():
+        return synthetic(int(count))
+    path = os.path.join(PAYLOADS_DIR, f"{os.path.basename(report_id)}.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as fp:
+        return json.load(fp)
@@ -0,0 +1,245 @@
+"""Benchmark do pipeline busca → renderização → exportação.
+
+Uso:
+    python benchmarks/run.py                    # mede e compara com baseline.json
+    python benchmarks/run.py --save-baseline    # mede e grava a nova baseline
+    python benchmarks/run.py --sizes 1 6 --repeat 50 --latency 20
+
+Um servidor local (``stub_server``) faz o papel de ``/Relatorio/{id}`` com
+payloads sintéticos de 1, 6, 50 e 500 avaliações. Cada tamanho roda num
+processo filho próprio, para que o pico de RSS medido seja só dele. Cada etapa
+é cronometrada separadamente (p50/p95/p99, em ms) junto com os bytes que gera.
+A saída é 1 quando alguma etapa ficou mais lenta que a baseline além da
+tolerância; a baseline só vale para a máquina em que foi gravada.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+SIZES = (1, 6, 50, 500)
+STAGES = (
+    "extract_id", "fetch_cold", "fetch_disk", "fetch_warm", "parse", "view", "charts", "html", "pdf",
+    "html_cached", "pdf_cached",
+)
+NOISE_FLOOR_MS = 0.05  # diferenças menores que isso são ruído de medição
+
+
+def _percentiles(samples):
+    """p50/p95/p99 em ms (interpolação linear entre as amostras)."""
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50": q[49] * 1000, "p95": q[94] * 1000, "p99": q[98] * 1000}
+
+
+def _retained_bytes(fn):
+    """Memória que o resultado de ``fn()`` continua ocupando depois da chamada."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        out = fn()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del out
+    return after - before
+
+
+def _peak_rss_kb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # macOS informa em bytes
+
+
+# --- PROCESSO FILHO: MEDE UM TAMANHO DE PAYLOAD ---
+
+def measure(count, repeat):
+    """Tempos e bytes de cada etapa para um relatório com ``count`` avaliações."""
+    sys.path.insert(0, ROOT_DIR)
+    from balanca_api import client, disk_cache, extract_id_from_url, fetch_data
+    from report_cache import report_cache
+    from report_engine import open_report, report_html, report_pdf
+    from report_charts import svgs_from_matrix
+    from report_model import parse_report
+    from report_pdf import render_report_pdf
+    from report_template import render_report_html, to_script_json
+    from report_view import build_view_model, select_history
+
+    report_id = f"sintetico-{count}"
+    link = f"https://balanca.example.com/relatorio#{report_id}"
+
+    def fetch_cold():
+        report_cache.clear()
+        disk_cache.remove(report_id)
+        return fetch_data(report_id)
+
+    def fetch_disk():
+        report_cache.clear()
+        return fetch_data(report_id)
+
+    data = fetch_cold()
+    if not data:
+        raise SystemExit(f"o servidor não devolveu {report_id}")
+    report = open_report(report_id)
+    body = client.get(f"Relatorio/{report_id}").content
+    stages = {
+        "extract_id": lambda: extract_id_from_url(link),
+        "fetch_cold": fetch_cold,
+        "fetch_disk": fetch_disk,
+        "fetch_warm": lambda: fetch_data(report_id),
+        "parse": lambda: parse_report(json.loads(body)),
+        "view": lambda: build_view_model(data),  # textos da página, já formatados
+        "charts": lambda: svgs_from_matrix(select_history(data.historico).valores),
+        "html": lambda: render_report_html(data),
+        "pdf": lambda: render_report_pdf(data),
+        "html_cached": lambda: report_html(report),  # cache de artefatos (memória)
+        "pdf_cached": lambda: report_pdf(report),
+    }
+    emitted = {
+        "extract_id": lambda out: len(out),
+        "fetch_cold": lambda out: len(body),
+        "fetch_disk": lambda out: disk_cache.stats()["bytes"],
+        "fetch_warm": lambda out: 0,
+        "parse": lambda out: _retained_bytes(lambda: parse_report(json.loads(body))),  # memória do modelo
+        "view": lambda out: len(to_script_json(out).encode("utf-8")),
+        "charts": lambda out: sum(len(svg) for svg in out.values()),
+        "html": len,
+        "pdf": len,
+        "html_cached": len,
+        "pdf_cached": len,
+    }
+
+    results = {}
+    for name in STAGES:
+        fn = stages[name]
+        out = fn()  # aquecimento: template, imagens, conexões
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - started)
+        results[name] = {**_percentiles(samples), "bytes": emitted[name](out)}
+    return {"stages": results, "peak_rss_kb": _peak_rss_kb()}
+
+
+# --- PROCESSO PRINCIPAL ---
+
+def run(sizes, repeat, latency_ms):
+    sys.path.insert(0, BENCH_DIR)
+    import stub_server
+
+    server, url = stub_server.start(latency_ms=latency_ms)
+    cache_dir = tempfile.mkdtemp(prefix="bench-relatorios-")
+    env = {
+        **os.environ,
+        "BALANCA_API_URL": url,
+        "REPORT_DISK_CACHE_DIR": os.path.join(cache_dir, "relatorios"),
+        "REPORT_ARTIFACT_CACHE_DIR": os.path.join(cache_dir, "artefatos"),
+    }
+    results = {}
+    try:
+        for count in sizes:
+            print(f"medindo {count} avaliação(ões)...", file=sys.stderr)
+            out = subprocess.run(
+                [sys.executable, __file__, "--worker", str(count), "--repeat", str(repeat)],
+                env=env, check=True, capture_output=True, text=True,
+            ).stdout
+            results[str(count)] = json.loads(out)
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return {
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "repeat": repeat,
+        "latency_ms": latency_ms,
+        "sizes": results,
+    }
+
+
+def _fmt_ms(value):
+    return f"{value:9.3f}" if value >= 0.01 else f"{value * 1000:7.2f}µs"
+
+
+def print_report(report, log=sys.stdout):
+    for count, result in report["sizes"].items():
+        rss = result["peak_rss_kb"]
+        print(f"\n{count} avaliação(ões) — pico de RSS: {rss / 1024:.1f} MB" if rss else f"\n{count} avaliação(ões)", file=log)
+        print(f"  {'etapa':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'bytes':>12}", file=log)
+        for name, stage in result["stages"].items():
+            print(
+                f"  {name:<12}{_fmt_ms(stage['p50']):>10}{_fmt_ms(stage['p95']):>10}"
+                f"{_fmt_ms(stage['p99']):>10}{stage['bytes']:>12}",
+                file=log,
+            )
+
+
+def compare(report, baseline, tolerance):
+    """Etapas cujo p50 piorou mais que ``tolerance`` (fração) em relação à baseline."""
+    regressions = []
+    for count, result in report["sizes"].items():
+        base_stages = baseline.get("sizes", {}).get(count, {}).get("stages", {})
+        for name, stage in result["stages"].items():
+            base = base_stages.get(name)
+            if base is None:
+                continue
+            if stage["p50"] > base["p50"] * (1 + tolerance) and stage["p50"] - base["p50"] > NOISE_FLOOR_MS:
+                regressions.append((count, name, base["p50"], stage["p50"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de relatórios.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="quantidades de avaliações")
+    parser.add_argument("--repeat", type=int, default=30, help="execuções medidas por etapa (padrão: 30)")
+    parser.add_argument("--latency", type=float, default=0.0, help="latência simulada da API em ms")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="piora tolerada no p50 (padrão: 0.25)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="arquivo da baseline")
+    parser.add_argument("--save-baseline", action="store_true", help="grava o resultado como nova baseline")
+    parser.add_argument("--output", help="grava o resultado completo em JSON")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        json.dump(measure(args.worker, args.repeat), sys.stdout)
+        return 0
+
+    report = run(args.sizes, args.repeat, args.latency)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as fp:
+            json.dump(report, fp, indent=2)
+            fp.write("\n")
+        print(f"\nBaseline gravada em {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print("\nSem baseline para comparar (use --save-baseline).")
+        return 0
+    with open(args.baseline, encoding="utf-8") as fp:
+        regressions = compare(report, json.load(fp), args.tolerance)
+    if not regressions:
+        print(f"\nNenhuma regressão além de {args.tolerance:.0%} em relação à baseline.")
+        return 0
+    print(f"\n{len(regressions)} regressão(ões) além de {args.tolerance:.0%}:")
+    for count, name, base, now in regressions:
+        print(f"  {count} avaliação(ões) / {name}: {base:.3f} ms → {now:.3f} ms")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Servidor local que imita ``GET /Relatorio/{id}`` da API da balança.
+
+Uso: ``python benchmarks/stub_server.py [porta] [latência_ms]``, e então
+``BALANCA_API_URL=http://127.0.0.1:<porta>``.
+"""
+import functools
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import payloads
+
+
+@functools.lru_cache(maxsize=64)
+def _body(report_id):
+    data = payloads.load(report_id)
+    return None if data is None else json.dumps(data).encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como a API real
+    disable_nagle_algorithm = True  # cabeçalho e corpo saem em writes separados
+    latency = 0.0
+
+    def do_GET(self):
+        prefix, _, report_id = self.path.rpartition("/")
+        body = _body(report_id) if prefix.endswith("/Relatorio") else None
+        if self.latency:
+            time.sleep(self.latency)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start(port=0, latency_ms=0.0):
+    """Sobe o servidor numa thread; devolve ``(servidor, url_base)``."""
+    handler = type("Handler", (_Handler,), {"latency": latency_ms / 1000})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    server, url = start(port, latency)
+    print(f"Servindo {url}/Relatorio/sintetico-<n> (Ctrl+C para sair)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,210 @@
+"""Cache em disco das respostas de ``/Relatorio/{id}``, que sobrevive a reinícios.
+
+Cada relatório vira um arquivo ``<sha256(id)>.rc`` com um cabeçalho JSON
+(ID, hash SHA-256 do conteúdo, ETag/Last-Modified da API, quando foi gravado)
+seguido do corpo comprimido com zlib. A gravação é atômica (arquivo temporário
++ ``os.replace``), o hash é conferido na leitura e o diretório tem limite de
+tamanho: ao passar dele, saem os arquivos usados há mais tempo (mtime, que é
+atualizado a cada leitura).
+
+Os arquivos contêm dados de pacientes: são criados só com permissão do dono.
+"""
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# --- CONFIGURAÇÃO (sobrescrevível por variáveis de ambiente) ---
+# REPORT_DISK_CACHE_DIR="" desliga o cache em disco
+DISK_CACHE_DIR = os.environ.get("REPORT_DISK_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "relatorios"))
+DISK_CACHE_MAX_BYTES = int(os.environ.get("REPORT_DISK_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+# Até esta idade a cópia em disco é usada sem consultar a API; depois, é revalidada
+DISK_CACHE_FRESH_SECONDS = float(os.environ.get("REPORT_DISK_CACHE_FRESH", 7 * 24 * 3600))
+# Depois disso, e por mais este tempo, ela ainda sai na hora e é revalidada em segundo plano
+DISK_CACHE_STALE_SECONDS = float(os.environ.get("REPORT_DISK_CACHE_STALE", 30 * 24 * 3600))
+
+_MAGIC = b"RC1\n"
+_SUFFIX = ".rc"
+
+
+class DiskEntry:
+    """Resposta guardada: corpo (já descomprimido) e metadados para revalidação."""
+
+    __slots__ = ("body", "digest", "etag", "last_modified", "stored_at")
+
+    def __init__(self, body, digest, etag=None, last_modified=None, stored_at=None):
+        self.body = body
+        self.digest = digest
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = time.time() if stored_at is None else stored_at
+
+    def age(self):
+        return time.time() - self.stored_at
+
+    def validators(self):
+        """Cabeçalhos da requisição condicional (vazio se a API não mandou nenhum)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class DiskCache:
+    """Arquivos comprimidos por chave, com verificação de hash e limite em bytes."""
+
+    def __init__(self, directory=DISK_CACHE_DIR, max_bytes=DISK_CACHE_MAX_BYTES, level=6):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.level = level
+        self._bytes = None  # calculado na primeira escrita
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.corrupted = 0
+
+    def _path(self, key):
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name[:2], name + _SUFFIX)
+
+    def get(self, key):
+        """Entrada guardada ou ``None`` (ausente, ilegível ou com hash divergente)."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fp:
+                raw = fp.read()
+        except OSError:
+            self.misses += 1
+            return None
+        try:
+            if not raw.startswith(_MAGIC):
+                raise ValueError("formato desconhecido")
+            offset = len(_MAGIC)
+            (header_len,) = struct.unpack_from(">I", raw, offset)
+            offset += 4
+            header = json.loads(raw[offset:offset + header_len])
+            body = zlib.decompress(raw[offset + header_len:])
+            digest = hashlib.sha256(body).hexdigest()
+            if header["key"] != key or header["digest"] != digest:
+                raise ValueError("conteúdo não confere com o hash")
+        except (ValueError, KeyError, struct.error, zlib.error):
+            self.corrupted += 1
+            self.misses += 1
+            self.remove(key)
+            return None
+        try:
+            os.utime(path)  # marca como usado recentemente (ordem de remoção)
+        except OSError:
+            pass
+        self.hits += 1
+        return DiskEntry(body, digest, header.get("etag"), header.get("last_modified"), header.get("stored_at"))
+
+    def put(self, key, body, etag=None, last_modified=None):
+        """Grava ``body`` (bytes) e devolve a ``DiskEntry`` correspondente."""
+        entry = DiskEntry(body, hashlib.sha256(body).hexdigest(), etag, last_modified)
+        self._write(key, entry)
+        return entry
+
+    def touch(self, key, entry):
+        """Renova ``stored_at`` de uma entrada revalidada (resposta 304)."""
+        entry.stored_at = time.time()
+        self._write(key, entry)
+
+    def remove(self, key):
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes -= size
+
+    def clear(self):
+        for path, _, _ in self._files():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            size = self._bytes
+        return {
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "corrupted": self.corrupted,
+        }
+
+    def _write(self, key, entry):
+        header = json.dumps({
+            "key": key,
+            "digest": entry.digest,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "stored_at": entry.stored_at,
+        }).encode("utf-8")
+        content = b"".join((_MAGIC, struct.pack(">I", len(header)), header, zlib.compress(entry.body, self.level)))
+        if len(content) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(content)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        os.replace(tmp, path)
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(size for _, size, _ in self._files())
+            else:
+                self._bytes += len(content) - previous
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _files(self):
+        """``(caminho, tamanho, mtime)`` de cada arquivo do cache."""
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def _evict(self):
+        """Remove os menos usados até ficar em 90% do limite (chamado com o lock)."""
+        target = self.max_bytes * 0.9
+        for path, size, _ in sorted(self._files(), key=lambda item: item[2]):
+            if self._bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._bytes -= size
+            self.evictions += 1
+
+
+# Instância única do processo (``None`` se desligado)
+disk_cache = DiskCache() if DISK_CACHE_DIR else None
@@ -0,0 +1,198 @@
+"""Exportação em lote de relatórios em PDF, sem Streamlit.
+
+Uso:
+    python export_reports.py links.txt -o relatorios.zip
+    cat links.txt | python export_reports.py - -o pasta_saida/ --workers 16
+    python export_reports.py turma.txt -o caderno.pdf   # um só PDF, na ordem da entrada
+
+Cada linha da entrada é um link (``...#ID``), um ID ou um ``#ID``; linhas que
+começam com ``# `` (cerquilha e espaço) são comentários. Os relatórios são
+buscados e renderizados em paralelo e gravados no ZIP/pasta assim que ficam
+prontos, de modo que a memória não cresce com o tamanho do lote.
+
+Com saída ``.pdf``, sai um caderno (um relatório por participante, com
+marcadores no nome de cada um): as páginas vão para o disco conforme são
+desenhadas, e logo, silhueta e fontes entram uma única vez no arquivo.
+"""
+import argparse
+import os
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import metrics
+from pdf_writer import PdfWriter
+from report_engine import append_pdf, build_pdf, extract_id_from_url, open_report, patient_name
+
+
+def read_report_ids(source, log=sys.stderr):
+    """Lê IDs (ou links) de um arquivo, ignorando linhas vazias, comentários e repetidos.
+
+    Comentário é a linha ``#`` sozinha ou começando com ``# ``; ``#ID`` (o
+    fragmento do link colado sem o resto) é um ID. Linhas sem ID e repetidas
+    são avisadas em ``log``.
+    """
+    ids, seen = [], set()
+    for number, line in enumerate(source, 1):
+        line = line.strip()
+        if not line or line == "#" or line.startswith("# "):
+            continue
+        report_id = extract_id_from_url(line)
+        if not report_id:
+            print(f"linha {number} ignorada (sem ID): {line}", file=log)
+        elif report_id in seen:
+            print(f"linha {number} ignorada (ID repetido): {report_id}", file=log)
+        else:
+            seen.add(report_id)
+            ids.append(report_id)
+    return ids
+
+
+class _Output:
+    """Destino dos PDFs: arquivo ZIP ou pasta, com nomes únicos."""
+
+    def __init__(self, path):
+        self.path = path
+        self._names = set()
+        self._zip = None
+        if path.lower().endswith(".zip"):
+            self._zip = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+        else:
+            os.makedirs(path, exist_ok=True)
+
+    def write(self, filename, report_id, content):
+        if filename in self._names:
+            stem, ext = os.path.splitext(filename)
+            filename = f"{stem}_{report_id}{ext}"
+        self._names.add(filename)
+        if self._zip is not None:
+            self._zip.writestr(filename, content)
+        else:
+            with open(os.path.join(self.path, filename), "wb") as fp:
+                fp.write(content)
+        return filename
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+
+
+def export_reports(report_ids, output_path, workers=8, log=sys.stderr):
+    """Exporta todos os IDs para ``output_path``; devolve a lista de falhas ``(id, erro)``.
+
+    No máximo ``2 * workers`` relatórios ficam em andamento ou prontos e não
+    gravados; cada PDF sai da memória assim que é gravado.
+    """
+    output = _Output(output_path)
+    failures = []
+    total = len(report_ids)
+    started = time.perf_counter()
+    running = {}  # future -> report_id
+    next_ids = iter(report_ids)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+
+            def submit_next():
+                report_id = next(next_ids, None)
+                if report_id is not None:
+                    running[pool.submit(build_pdf, report_id)] = report_id
+
+            for _ in range(2 * workers):
+                submit_next()
+            done = 0
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    report_id = running.pop(future)
+                    submit_next()
+                    done += 1
+                    try:
+                        filename, content = future.result()
+                    except Exception as exc:
+                        failures.append((report_id, exc))
+                        print(f"[{done}/{total}] ERRO {report_id}: {exc}", file=log)
+                        continue
+                    filename = output.write(filename, report_id, content)
+                    print(f"[{done}/{total}] {filename} ({len(content) // 1024} KB)", file=log)
+    finally:
+        output.close()
+    _summary(total, failures, time.perf_counter() - started, log)
+    return failures
+
+
+def export_booklet(report_ids, output_path, workers=8, log=sys.stderr):
+    """Grava todos os IDs, na ordem dada, num único PDF em ``output_path``; devolve as falhas ``(id, erro)``.
+
+    As buscas correm em paralelo, no máximo ``2 * workers`` à frente da
+    página sendo desenhada; cada relatório vai para o disco assim que é
+    desenhado.
+    """
+    failures = []
+    total = len(report_ids)
+    started = time.perf_counter()
+    pending = deque()
+    next_ids = iter(report_ids)
+    with open(output_path, "wb") as fp, ThreadPoolExecutor(max_workers=workers) as pool:
+        writer = PdfWriter(fp)
+
+        def fetch_next():
+            report_id = next(next_ids, None)
+            if report_id is not None:
+                pending.append((report_id, pool.submit(open_report, report_id)))
+
+        for _ in range(2 * workers):
+            fetch_next()
+        done = 0
+        while pending:
+            report_id, future = pending.popleft()
+            fetch_next()
+            done += 1
+            try:
+                report = future.result()
+            except Exception as exc:
+                failures.append((report_id, exc))
+                print(f"[{done}/{total}] ERRO {report_id}: {exc}", file=log)
+                continue
+            with metrics.span("render.booklet_page"):
+                append_pdf(writer, report)
+            print(f"[{done}/{total}] {patient_name(report.data)}", file=log)
+        writer.close()
+    _summary(total, failures, time.perf_counter() - started, log)
+    print(f"Caderno: {output_path} ({os.path.getsize(output_path) // 1024} KB)", file=log)
+    return failures
+
+
+def _summary(total, failures, elapsed, log):
+    ok = total - len(failures)
+    rate = ok / elapsed if elapsed else 0.0
+    print(f"Concluído: {ok}/{total} relatórios em {elapsed:.1f}s ({rate:.2f} relatórios/s), {len(failures)} falha(s).", file=log)
+    for report_id, exc in failures:
+        print(f"  - {report_id}: {exc}", file=log)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta relatórios da balança em PDF (ZIP ou pasta).")
+    parser.add_argument("entrada", help="arquivo com um link/ID por linha ('-' para stdin)")
+    parser.add_argument("-o", "--output", required=True,
+                        help="arquivo .zip, pasta de destino ou arquivo .pdf (caderno único, na ordem da entrada)")
+    parser.add_argument("-w", "--workers", type=int, default=8, help="buscas/renderizações simultâneas (padrão: 8)")
+    args = parser.parse_args(argv)
+
+    if args.entrada == "-":
+        report_ids = read_report_ids(sys.stdin)
+    else:
+        with open(args.entrada, encoding="utf-8") as fp:
+            report_ids = read_report_ids(fp)
+    if not report_ids:
+        parser.error("nenhum link/ID encontrado na entrada")
+
+    metrics.start_from_env()
+    export = export_booklet if args.output.lower().endswith(".pdf") else export_reports
+    failures = export(report_ids, args.output, workers=args.workers)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,308 @@
+"""Métricas do processo: contadores, histogramas de tempo (spans) e trace IDs.
+
+Sem dependências externas. O texto sai no formato de exposição do Prometheus,
+por um endpoint HTTP lateral (``REPORT_METRICS_PORT``) e/ou periodicamente no
+log (``REPORT_METRICS_LOG_INTERVAL``, em segundos).
+
+``trace`` define um trace ID para a requisição atual (via ``contextvars``, ou
+seja, por thread / tarefa asyncio). Com ele ativo, cada span também gera uma
+linha de log ``DEBUG`` com o ID, permitindo seguir um relatório de ponta a ponta.
+"""
+import contextlib
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Contador monotônico, com uma série por combinação de rótulos."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, key, (), value
+
+
+class Histogram:
+    """Histograma com buckets fixos (cumulativos na exposição, como no Prometheus)."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets=TIME_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._series = {}  # rótulos -> [contagem por bucket..., +Inf, soma]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def count(self, **labels):
+        series = self._series.get(_label_key(labels))
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series[:-1]):
+                cumulative += count
+                le = bound if bound == "+Inf" else _format_value(float(bound))
+                yield f"{self.name}_bucket", key, (("le", le),), cumulative
+            yield f"{self.name}_sum", key, (), series[-1]
+            yield f"{self.name}_count", key, (), cumulative
+
+
+class Gauge:
+    """Valor instantâneo; com ``set_function``, lido na hora da exposição."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._function = None
+        self._lock = threading.Lock()
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def set_function(self, fn):
+        """``fn()`` passa a dar o valor (sem rótulos) a cada leitura."""
+        self._function = fn
+
+    def value(self, **labels):
+        if self._function is not None and not labels:
+            return self._function()
+        return self._values.get(_label_key(labels), 0)
+
+    def samples(self):
+        if self._function is not None:
+            yield self.name, (), (), self._function()
+            return
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, key, (), value
+
+
+class Registry:
+    """Conjunto de métricas do processo, exposto no formato texto do Prometheus."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation):
+        return self._register(Counter(name, documentation))
+
+    def histogram(self, name, documentation, buckets=TIME_BUCKETS):
+        return self._register(Histogram(name, documentation, buckets))
+
+    def gauge(self, name, documentation):
+        return self._register(Gauge(name, documentation))
+
+    def render(self):
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, extra, value in metric.samples():
+                lines.append(f"{name}{_format_labels(key, extra)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Registro único do processo e as métricas do pipeline de relatórios
+registry = Registry()
+
+STAGE_SECONDS = registry.histogram("report_stage_seconds", "Duração de cada etapa do pipeline do relatório.")
+CACHE_REQUESTS = registry.counter(
+    "report_cache_requests_total",
+    "Consultas ao cache de relatórios, por resultado: hit, negative (ID lembrado como ausente), revalidating"
+    " (vencido servido na hora), miss, coalesced, invalid, stale_if_error (atualização falhou, cópia mantida).",
+)
+DISK_CACHE_REQUESTS = registry.counter(
+    "report_disk_cache_requests_total",
+    "Cache em disco após falta na memória: hit, revalidating, revalidated, stale, stale_if_error, miss, error.",
+)
+ARTIFACT_REQUESTS = registry.counter(
+    "report_artifact_requests_total", "HTML/PDF prontos, por tipo e origem: memory, disk, miss (renderizado) ou disk_error."
+)
+UPSTREAM_REQUESTS = registry.counter("balanca_upstream_requests_total", "Respostas da API da balança, por status HTTP.")
+UPSTREAM_ERRORS = registry.counter("balanca_upstream_errors_total", "Falhas nas chamadas à API da balança, por tipo.")
+PAYLOAD_BYTES = registry.histogram("report_payload_bytes", "Tamanho dos dados recebidos/gerados, por tipo.", SIZE_BUCKETS)
+HTTP_REQUESTS = registry.counter("report_http_requests_total", "Requisições ao serviço HTTP, por rota e status.")
+PREFETCH_QUEUE_DEPTH = registry.gauge("report_prefetch_queue_depth", "Relatórios aguardando pré-carregamento.")
+PREFETCH_LAG_SECONDS = registry.gauge(
+    "report_prefetch_lag_seconds", "Há quanto tempo o relatório mais antigo da fila aguarda."
+)
+PREFETCH_WAIT_SECONDS = registry.histogram(
+    "report_prefetch_wait_seconds", "Espera na fila até o pré-carregamento começar.",
+    (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+)
+PREFETCH_JOBS = registry.counter("report_prefetch_jobs_total", "Pré-carregamentos concluídos, por resultado (done/failed).")
+
+
+# --- TRACE IDS E SPANS ---
+
+_trace_id = contextvars.ContextVar("report_trace_id", default=None)
+
+
+def current_trace_id():
+    return _trace_id.get()
+
+
+@contextlib.contextmanager
+def trace(trace_id=None):
+    """Ativa um trace ID (gerado se não informado) até o fim do bloco."""
+    token = _trace_id.set(trace_id or uuid.uuid4().hex[:16])
+    try:
+        yield _trace_id.get()
+    finally:
+        _trace_id.reset(token)
+
+
+def observe_stage(stage, seconds):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    trace_id = _trace_id.get()
+    if trace_id is not None:
+        logger.debug("trace=%s stage=%s %.2fms", trace_id, stage, seconds * 1000)
+
+
+@contextlib.contextmanager
+def span(stage):
+    """Cronometra o bloco em ``report_stage_seconds{stage=...}`` (inclusive se levantar)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def traced(stage):
+    """Decorador: cada chamada ganha um trace ID novo e um span ``stage``."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with trace(), span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# --- EXPOSIÇÃO ---
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_http_server(port, addr="0.0.0.0"):
+    """Serve ``/metrics`` numa thread própria; devolve o servidor."""
+    server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def _log_periodically(interval):
+    while True:
+        time.sleep(interval)
+        logger.info("métricas do relatório:\n%s", registry.render())
+
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def start_from_env():
+    """Liga o endpoint / o log periódico conforme o ambiente (uma vez por processo)."""
+    global _started
+    with _start_lock:
+        if _started:
+            return
+        _started = True
+        port = os.environ.get("REPORT_METRICS_PORT")
+        if port:
+            try:
+                start_http_server(int(port))
+            except OSError as exc:  # outro app do mesmo host já usa a porta
+                logger.warning("endpoint de métricas não iniciado na porta %s: %s", port, exc)
+        interval = float(os.environ.get("REPORT_METRICS_LOG_INTERVAL", 0))
+        if interval > 0:
+            threading.Thread(target=_log_periodically, args=(interval,), name="metrics-log", daemon=True).start()
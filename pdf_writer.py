@@ -0,0 +1,393 @@
+"""Gerador mínimo de PDF vetorial, sem dependências externas.
+
+Escreve os objetos direto no arquivo de saída à medida que as páginas são
+criadas (só os offsets do xref e os marcadores ficam em memória), então um
+documento com centenas de relatórios ocupa em memória o mesmo que um só.
+Fontes são as Type1 padrão (Helvetica/Helvetica-Bold, sem embutir) e as
+imagens PNG viram XObjects compartilhados por todas as páginas através de um
+único dicionário de recursos.
+"""
+import struct
+import unicodedata
+import zlib
+
+from assets import asset_store
+
+# A4 em pontos; o layout trabalha em "px" CSS (96 dpi) como o HTML original
+A4_WIDTH = 595.28
+A4_HEIGHT = 841.89
+PX = 0.75
+
+FONTS = {"F1": "Helvetica", "F2": "Helvetica-Bold"}
+
+# Larguras AFM (1/1000 em) dos caracteres 32..126 das fontes padrão
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+_WIDTHS = {"F1": _HELVETICA_WIDTHS, "F2": _HELVETICA_BOLD_WIDTHS}
+_EXTRA_WIDTHS = {"²": 333, "°": 400, "º": 365, "ª": 370, "Ω": 768}
+
+
+def _char_width(font, ch):
+    code = ord(ch)
+    if 32 <= code <= 126:
+        return _WIDTHS[font][code - 32]
+    if ch in _EXTRA_WIDTHS:
+        return _EXTRA_WIDTHS[ch]
+    # Letras acentuadas têm a largura da letra base
+    base = unicodedata.normalize("NFD", ch)[0]
+    if base != ch and 32 <= ord(base) <= 126:
+        return _WIDTHS[font][ord(base) - 32]
+    return 556
+
+
+def text_width(text, size, font="F1"):
+    """Largura do texto em px para o tamanho de fonte dado."""
+    return sum(_char_width(font, ch) for ch in text) * size / 1000
+
+
+def hex_to_rgb(color):
+    color = color.lstrip("#")
+    return tuple(int(color[i:i + 2], 16) / 255 for i in (0, 2, 4))
+
+
+def blend(color, background, alpha):
+    """Cor sólida equivalente a ``color`` com opacidade ``alpha`` sobre ``background``."""
+    fg, bg = hex_to_rgb(color), hex_to_rgb(background)
+    return "#" + "".join(f"{round((a * alpha + b * (1 - alpha)) * 255):02x}" for a, b in zip(fg, bg))
+
+
+def _num(value):
+    return f"{value:.2f}".rstrip("0").rstrip(".") or "0"
+
+
+def _pdf_string(text):
+    raw = text.encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _pdf_text(text):
+    """Texto fora do conteúdo da página (sumário): UTF-16 em hexadecimal, qualquer caractere."""
+    return "<" + ("\ufeff" + text).encode("utf-16-be").hex().upper() + ">"
+
+
+# --- IMAGENS PNG ---
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def _unfilter(raw, width, height, bpp):
+    stride = width * bpp
+    out = bytearray(stride * height)
+    prev = bytearray(stride)
+    pos = 0
+    for y in range(height):
+        ftype = raw[pos]
+        line = bytearray(raw[pos + 1:pos + 1 + stride])
+        pos += stride + 1
+        if ftype == 1:
+            for i in range(bpp, stride):
+                line[i] = (line[i] + line[i - bpp]) & 0xFF
+        elif ftype == 2:
+            line = bytearray((a + b) & 0xFF for a, b in zip(line, prev))
+        elif ftype == 3:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif ftype == 4:
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                upleft = prev[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + _paeth(left, prev[i], upleft)) & 0xFF
+        out[y * stride:(y + 1) * stride] = line
+        prev = line
+    return out
+
+
+def load_png(path):
+    """Converte um PNG (8 bits, sem entrelaçamento) em dados prontos para XObject.
+
+    O arquivo é lido pelo ``assets.asset_store`` e o resultado fica guardado
+    junto com ele: cada versão da imagem (hash do conteúdo) é decodificada uma
+    vez por processo, e trocar o arquivo em disco invalida a decodificação.
+    """
+    asset = asset_store.get(path)
+    if asset is None:
+        raise FileNotFoundError(path)
+    decoded = asset.variants.get("pdf")
+    if decoded is None:
+        decoded = asset.variants["pdf"] = _decode_png(path, asset.content)
+    return decoded
+
+
+def _decode_png(path, data):
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError(f"{path} não é um PNG")
+    pos, idat, header = 8, [], None
+    while pos < len(data):
+        length, ctype = struct.unpack(">I4s", data[pos:pos + 8])
+        chunk = data[pos + 8:pos + 8 + length]
+        if ctype == b"IHDR":
+            header = struct.unpack(">IIBBBBB", chunk)
+        elif ctype == b"IDAT":
+            idat.append(chunk)
+        elif ctype == b"IEND":
+            break
+        pos += length + 12
+    width, height, depth, color_type, _, _, interlace = header
+    if depth != 8 or interlace or color_type not in (0, 2, 4, 6):
+        raise ValueError(f"{path}: formato PNG não suportado")
+    colors = 1 if color_type in (0, 4) else 3
+    colorspace = "/DeviceGray" if colors == 1 else "/DeviceRGB"
+    stream = b"".join(idat)
+    if color_type in (0, 2):
+        # Sem alfa: o PDF aplica os filtros do PNG via DecodeParms
+        parms = f"/DecodeParms << /Predictor 15 /Colors {colors} /BitsPerComponent 8 /Columns {width} >>"
+        return width, height, colorspace, stream, parms, None
+    bpp = colors + 1
+    pixels = _unfilter(zlib.decompress(stream), width, height, bpp)
+    color = bytearray(width * height * colors)
+    for c in range(colors):
+        color[c::colors] = pixels[c::bpp]
+    alpha = bytes(pixels[colors::bpp])
+    return width, height, colorspace, zlib.compress(bytes(color), 6), "", zlib.compress(alpha, 6)
+
+
+# --- DOCUMENTO ---
+
+class PdfWriter:
+    """Escreve um PDF objeto a objeto em ``fp`` (arquivo binário ou BytesIO)."""
+
+    def __init__(self, fp, compress=True):
+        self.fp = fp
+        self.compress = compress
+        self._offsets = {}
+        self._written = 0
+        self._next_id = 4  # 1 catálogo, 2 árvore de páginas, 3 recursos
+        self._pages = []
+        self._images = {}
+        self._outline = []  # marcadores: (título, índice da página)
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write(self, data):
+        self.fp.write(data)
+        self._written += len(data)
+
+    def _new_id(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def _object(self, obj_id, body):
+        self._offsets[obj_id] = self._written
+        self._write(f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    def _stream(self, obj_id, data, extra="", compress=None):
+        compress = self.compress if compress is None else compress
+        if compress:
+            data = zlib.compress(data, 6)
+            extra += " /Filter /FlateDecode"
+        head = f"<< /Length {len(data)}{extra} >>\nstream\n".encode()
+        self._object(obj_id, head + data + b"\nendstream")
+
+    def image(self, path):
+        """Registra o PNG como XObject (uma única vez por documento) e devolve seu nome."""
+        if path in self._images:
+            return self._images[path][0]
+        width, height, colorspace, data, parms, alpha = load_png(path)
+        smask = ""
+        if alpha is not None:
+            smask_id = self._new_id()
+            self._stream(smask_id, alpha, f" /Type /XObject /Subtype /Image /Width {width} /Height {height}"
+                         " /ColorSpace /DeviceGray /BitsPerComponent 8 /Filter /FlateDecode", compress=False)
+            smask = f" /SMask {smask_id} 0 R"
+        obj_id = self._new_id()
+        self._stream(obj_id, data, f" /Type /XObject /Subtype /Image /Width {width} /Height {height}"
+                     f" /ColorSpace {colorspace} /BitsPerComponent 8 /Filter /FlateDecode {parms}{smask}",
+                     compress=False)
+        name = f"Im{len(self._images) + 1}"
+        self._images[path] = (name, obj_id, width, height)
+        return name
+
+    def image_size(self, path):
+        self.image(path)
+        _, _, width, height = self._images[path]
+        return width, height
+
+    def add_page(self, canvas):
+        """Grava a página imediatamente; só o id dela fica em memória."""
+        content_id, page_id = self._new_id(), self._new_id()
+        self._stream(content_id, canvas.getvalue())
+        self._object(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_num(A4_WIDTH)} {_num(A4_HEIGHT)}]"
+            f" /Resources 3 0 R /Contents {content_id} 0 R >>"
+        ).encode())
+        self._pages.append(page_id)
+
+    def bookmark(self, title):
+        """Marcador no sumário do leitor de PDF apontando para a próxima página adicionada."""
+        self._outline.append((title, len(self._pages)))
+
+    def _write_outline(self):
+        """Grava o sumário (se houver marcadores) e devolve a entrada do catálogo."""
+        outline = [(title, page) for title, page in self._outline if page < len(self._pages)]
+        if not outline:
+            return ""
+        root_id = self._new_id()
+        item_ids = [self._new_id() for _ in outline]
+        for i, (title, page) in enumerate(outline):
+            links = f" /Prev {item_ids[i - 1]} 0 R" if i else ""
+            links += f" /Next {item_ids[i + 1]} 0 R" if i + 1 < len(item_ids) else ""
+            self._object(item_ids[i], (
+                f"<< /Title {_pdf_text(title)} /Parent {root_id} 0 R{links}"
+                f" /Dest [{self._pages[page]} 0 R /Fit] >>"
+            ).encode())
+        self._object(root_id, (
+            f"<< /Type /Outlines /First {item_ids[0]} 0 R /Last {item_ids[-1]} 0 R /Count {len(item_ids)} >>"
+        ).encode())
+        return f" /Outlines {root_id} 0 R /PageMode /UseOutlines"
+
+    def close(self):
+        fonts = " ".join(
+            f"/{name} << /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>"
+            for name, base in FONTS.items()
+        )
+        xobjects = " ".join(f"/{name} {obj_id} 0 R" for name, obj_id, _, _ in self._images.values())
+        self._object(3, f"<< /ProcSet [/PDF /Text /ImageC /ImageB] /Font << {fonts} >> /XObject << {xobjects} >> >>".encode())
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._pages)
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>".encode())
+        outline = self._write_outline()
+        self._object(1, f"<< /Type /Catalog /Pages 2 0 R{outline} >>".encode())
+        xref_at = self._written
+        size = self._next_id
+        lines = [f"xref\n0 {size}\n0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            lines.append(f"{self._offsets.get(obj_id, 0):010d} 00000 n \n")
+        self._write("".join(lines).encode())
+        self._write(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode())
+
+
+class Canvas:
+    """Operadores de desenho em coordenadas px com origem no topo esquerdo (como no CSS)."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self._ops = []
+
+    def getvalue(self):
+        return "\n".join(self._ops).encode("latin-1")
+
+    def _pt(self, x, y):
+        return _num(x * PX), _num(A4_HEIGHT - y * PX)
+
+    def _fill_color(self, color):
+        r, g, b = hex_to_rgb(color)
+        self._ops.append(f"{_num(r)} {_num(g)} {_num(b)} rg")
+
+    def _stroke_color(self, color):
+        r, g, b = hex_to_rgb(color)
+        self._ops.append(f"{_num(r)} {_num(g)} {_num(b)} RG")
+
+    def rect(self, x, y, w, h, fill=None, stroke=None, line_width=1):
+        px, py = self._pt(x, y + h)
+        self._ops.append(f"{px} {py} {_num(w * PX)} {_num(h * PX)} re")
+        self._paint(fill, stroke, line_width)
+
+    def rounded_rect(self, x, y, w, h, radius, fill=None, stroke=None, line_width=1):
+        k = 0.5523 * radius
+        pts = [
+            ("m", (x + radius, y)),
+            ("l", (x + w - radius, y)),
+            ("c", (x + w - radius + k, y, x + w, y + radius - k, x + w, y + radius)),
+            ("l", (x + w, y + h - radius)),
+            ("c", (x + w, y + h - radius + k, x + w - radius + k, y + h, x + w - radius, y + h)),
+            ("l", (x + radius, y + h)),
+            ("c", (x + radius - k, y + h, x, y + h - radius + k, x, y + h - radius)),
+            ("l", (x, y + radius)),
+            ("c", (x, y + radius - k, x + radius - k, y, x + radius, y)),
+        ]
+        for op, coords in pts:
+            args = []
+            for i in range(0, len(coords), 2):
+                args.extend(self._pt(coords[i], coords[i + 1]))
+            self._ops.append(" ".join(args) + " " + op)
+        self._ops.append("h")
+        self._paint(fill, stroke, line_width)
+
+    def line(self, x1, y1, x2, y2, color, line_width=1, dash=None):
+        self._stroke_color(color)
+        self._ops.append(f"{_num(line_width * PX)} w")
+        if dash:
+            self._ops.append(f"[{_num(dash * PX)}] 0 d")
+        self._ops.append("{} {} m {} {} l S".format(*self._pt(x1, y1), *self._pt(x2, y2)))
+        if dash:
+            self._ops.append("[] 0 d")
+
+    def polygon(self, points, fill=None, stroke=None, line_width=1, close=True):
+        first, rest = points[0], points[1:]
+        self._ops.append("{} {} m".format(*self._pt(*first)))
+        for point in rest:
+            self._ops.append("{} {} l".format(*self._pt(*point)))
+        if close:
+            self._ops.append("h")
+        self._paint(fill, stroke, line_width)
+
+    def circle(self, cx, cy, r, fill=None, stroke=None, line_width=1):
+        k = 0.5523 * r
+        self._ops.append("{} {} m".format(*self._pt(cx + r, cy)))
+        for seg in (
+            (cx + r, cy + k, cx + k, cy + r, cx, cy + r),
+            (cx - k, cy + r, cx - r, cy + k, cx - r, cy),
+            (cx - r, cy - k, cx - k, cy - r, cx, cy - r),
+            (cx + k, cy - r, cx + r, cy - k, cx + r, cy),
+        ):
+            self._ops.append("{} {} {} {} {} {} c".format(
+                *self._pt(seg[0], seg[1]), *self._pt(seg[2], seg[3]), *self._pt(seg[4], seg[5])))
+        self._paint(fill, stroke, line_width)
+
+    def _paint(self, fill, stroke, line_width):
+        if fill:
+            self._fill_color(fill)
+        if stroke:
+            self._stroke_color(stroke)
+            self._ops.append(f"{_num(line_width * PX)} w")
+        self._ops.append("B" if fill and stroke else "f" if fill else "S" if stroke else "n")
+
+    def text(self, x, y, text, size=12, bold=False, color="#000000", align="left"):
+        """Escreve ``text`` com a linha de base em ``y``; ``align`` relativo a ``x``."""
+        if text is None or text == "":
+            return
+        text = str(text)
+        font = "F2" if bold else "F1"
+        if align != "left":
+            width = text_width(text, size, font)
+            x -= width if align == "right" else width / 2
+        r, g, b = hex_to_rgb(color)
+        px, py = self._pt(x, y)
+        self._ops.append(
+            f"BT {_num(r)} {_num(g)} {_num(b)} rg /{font} {_num(size * PX)} Tf {px} {py} Td "
+            + _pdf_string(text).decode("latin-1") + " Tj ET"
+        )
+
+    def image(self, path, x, y, w, h):
+        name = self.writer.image(path)
+        px, py = self._pt(x, y + h)
+        self._ops.append(f"q {_num(w * PX)} 0 0 {_num(h * PX)} {px} {py} cm /{name} Do Q")
@@ -0,0 +1,154 @@
+"""Pré-carregamento, em segundo plano, dos relatórios das consultas do dia.
+
+A balança envia o resultado pouco antes da consulta; se o relatório for buscado
+e renderizado antes de a nutricionista abrir o link, ele já sai dos caches
+(``report_cache``/``disk_cache`` para os dados, ``artifact_cache`` para o HTML
+e o PDF). ``prefetch_queue`` é a fila do processo do app: recebe IDs e um
+pequeno grupo de threads os aquece, um por vez cada. A profundidade da fila e
+o atraso do item mais antigo saem nas métricas (``report_prefetch_*``).
+
+Também roda como processo companheiro, aquecendo os caches em disco que o app
+lê depois:
+    python prefetch.py agenda.txt
+    cat agenda.txt | python prefetch.py - --workers 4
+"""
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+
+import metrics
+from export_reports import read_report_ids
+from report_engine import warm_report
+
+# --- CONFIGURAÇÃO (sobrescrevível por variáveis de ambiente) ---
+# Poucas threads: renderizar disputa a CPU (e o GIL) com as sessões abertas
+PREFETCH_WORKERS = int(os.environ.get("REPORT_PREFETCH_WORKERS", 2))
+
+
+class PrefetchQueue:
+    """Fila de IDs a aquecer, atendida por ``workers`` threads iniciadas no primeiro envio.
+
+    IDs já na fila ou em andamento não são enfileirados de novo.
+    """
+
+    def __init__(self, workers=PREFETCH_WORKERS, warm=warm_report):
+        self.workers = workers
+        self.warm = warm
+        self._queue = queue.Queue()
+        self._pending = OrderedDict()  # report_id -> quando entrou na fila
+        self._running = set()
+        self._lock = threading.Lock()
+        self._threads = []
+        self.done = 0
+        self.failed = 0
+        self.failures = deque(maxlen=100)  # últimas falhas: (report_id, erro)
+
+    def submit(self, report_ids):
+        """Enfileira os IDs; devolve quantos entraram (os repetidos são ignorados)."""
+        added = 0
+        with self._lock:
+            self._start()
+            now = time.monotonic()
+            for report_id in report_ids:
+                if not report_id or report_id in self._pending or report_id in self._running:
+                    continue
+                self._pending[report_id] = now
+                self._queue.put(report_id)
+                added += 1
+        return added
+
+    def depth(self):
+        """Relatórios aguardando (sem contar os em andamento)."""
+        return len(self._pending)
+
+    def lag(self):
+        """Segundos que o relatório mais antigo da fila já esperou (0 se vazia)."""
+        with self._lock:
+            oldest = next(iter(self._pending.values()), None)
+        return time.monotonic() - oldest if oldest is not None else 0.0
+
+    def stats(self):
+        with self._lock:
+            running = len(self._running)
+        return {
+            "queued": self.depth(),
+            "running": running,
+            "done": self.done,
+            "failed": self.failed,
+            "lag": self.lag(),
+        }
+
+    def join(self):
+        """Espera a fila esvaziar e os pré-carregamentos em andamento terminarem."""
+        self._queue.join()
+
+    def _start(self):
+        """Inicia as threads (chamado com o lock)."""
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"prefetch-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _work(self):
+        while True:
+            report_id = self._queue.get()
+            with self._lock:
+                queued_at = self._pending.pop(report_id)
+                self._running.add(report_id)
+            metrics.PREFETCH_WAIT_SECONDS.observe(time.monotonic() - queued_at)
+            try:
+                with metrics.trace(), metrics.span("prefetch.report"):
+                    self.warm(report_id)
+            except Exception as exc:  # um relatório ruim não derruba a fila
+                self.failed += 1
+                self.failures.append((report_id, exc))
+                metrics.PREFETCH_JOBS.inc(result="failed")
+            else:
+                self.done += 1
+                metrics.PREFETCH_JOBS.inc(result="done")
+            finally:
+                with self._lock:
+                    self._running.discard(report_id)
+                self._queue.task_done()
+
+
+# Fila única do processo (as páginas Streamlit enfileiram aqui)
+prefetch_queue = PrefetchQueue()
+metrics.PREFETCH_QUEUE_DEPTH.set_function(prefetch_queue.depth)
+metrics.PREFETCH_LAG_SECONDS.set_function(prefetch_queue.lag)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pré-carrega relatórios da balança nos caches em disco.")
+    parser.add_argument("entrada", help="arquivo com um link/ID por linha ('-' para stdin)")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="pré-carregamentos simultâneos (padrão: 4)")
+    args = parser.parse_args(argv)
+
+    if args.entrada == "-":
+        report_ids = read_report_ids(sys.stdin)
+    else:
+        with open(args.entrada, encoding="utf-8") as fp:
+            report_ids = read_report_ids(fp)
+    if not report_ids:
+        parser.error("nenhum link/ID encontrado na entrada")
+
+    metrics.start_from_env()
+    fila = prefetch_queue
+    fila.workers = args.workers
+    started = time.perf_counter()
+    fila.submit(report_ids)
+    fila.join()
+    elapsed = time.perf_counter() - started
+    print(f"Pré-carregados: {fila.done}/{len(report_ids)} relatórios em {elapsed:.1f}s, {fila.failed} falha(s).",
+          file=sys.stderr)
+    for report_id, exc in fila.failures:
+        print(f"  - {report_id}: {exc}", file=sys.stderr)
+    return 1 if fila.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
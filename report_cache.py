@@ -0,0 +1,135 @@
+"""Cache de relatórios compartilhado por todo o processo.
+
+O Streamlit reexecuta os scripts ``app*.py`` a cada interação, mas módulos
+importados ficam em ``sys.modules``; por isso o cache mora aqui e é visto por
+todas as sessões (e pelos três apps, quando rodam no mesmo processo).
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# --- CONFIGURAÇÃO (sobrescrevível por variáveis de ambiente) ---
+CACHE_TTL_SECONDS = float(os.environ.get("REPORT_CACHE_TTL", 600))
+# Por quanto tempo, depois de vencido, um relatório ainda pode ser servido
+# enquanto é atualizado em segundo plano (stale-while-revalidate)
+CACHE_STALE_SECONDS = float(os.environ.get("REPORT_CACHE_STALE", 3600))
+CACHE_MAX_ENTRIES = int(os.environ.get("REPORT_CACHE_MAX_ENTRIES", 512))
+CACHE_MAX_BYTES = int(os.environ.get("REPORT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Cache negativo: por quanto tempo um ID inexistente (404) ou uma falha da API
+# sem cópia guardada é lembrada, em vez de ir à rede a cada reexecução da página
+CACHE_NEGATIVE_TTL_SECONDS = float(os.environ.get("REPORT_CACHE_NEGATIVE_TTL", 60))
+CACHE_ERROR_TTL_SECONDS = float(os.environ.get("REPORT_CACHE_ERROR_TTL", 10))
+
+
+class ReportCache:
+    """Cache LRU com TTL por entrada e limite de memória em bytes.
+
+    Com ``stale``, uma entrada vencida continua guardada por mais ``stale``
+    segundos: ``get`` não a devolve, mas ``lookup`` sim, marcada como vencida.
+    Cada entrada conta uma única expiração (ao ser vista vencida ou ao sair
+    do cache já vencida); leituras na janela contam à parte, em ``stats()["stale"]``.
+    Os valores guardados são compartilhados entre sessões: quem lê não deve
+    alterá-los.
+    """
+
+    def __init__(self, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, stale=0):
+        self.ttl = ttl
+        self.stale = stale
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # chave -> [valor, tamanho, expira_em, guardado_até, expiração_contada]
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_reads = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Retorna o valor em cache ou ``None`` (ausente ou expirado)."""
+        return self.lookup(key, allow_stale=False)[0]
+
+    def lookup(self, key, allow_stale=True):
+        """``(valor, vencido)``; ``(None, False)`` se ausente ou além da janela ``stale``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            value, _, expires_at, keep_until, _ = entry
+            now = time.monotonic()
+            if expires_at <= now:
+                self._expire(entry)
+                if keep_until <= now:
+                    self._remove(key)
+                    self.misses += 1
+                    return None, False
+                self.stale_reads += 1
+                if not allow_stale:
+                    return None, False
+                self._entries.move_to_end(key)
+                return value, True
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value, False
+
+    def put(self, key, value, size, ttl=None, stale=None):
+        """Guarda ``value`` ocupando ``size`` bytes; entradas maiores que o limite são ignoradas.
+
+        ``ttl``/``stale`` substituem os padrões do cache só para esta entrada.
+        """
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        keep_until = expires_at + (self.stale if stale is None else stale)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = [value, size, expires_at, keep_until, False]
+            self._bytes += size
+            now = time.monotonic()
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                entry = self._entries[oldest]
+                if entry[2] <= now:
+                    self._expire(entry)
+                else:
+                    self.evictions += 1
+                self._remove(oldest)
+
+    def invalidate(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Contadores para diagnóstico (hits, misses, evictions...)."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "stale": self.stale_reads,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _expire(self, entry):
+        if not entry[4]:
+            entry[4] = True
+            self.expirations += 1
+
+    def _remove(self, key):
+        self._bytes -= self._entries.pop(key)[1]
+
+
+# Instância única do processo usada por fetch_data nos apps
+report_cache = ReportCache(stale=CACHE_STALE_SECONDS)
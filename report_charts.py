@@ -0,0 +1,137 @@
+"""Gráficos do histórico (sparklines) gerados no servidor como SVG estático.
+
+Substitui as nove instâncias de ApexCharts do template: as séries são
+extraídas de ``data['avaliacoes']`` numa única passada para uma matriz numpy
+(``history_matrix``, guardada em ``report_model.Historico``) e cada gráfico
+vira uma string SVG com área, linha e marcadores.
+"""
+import warnings
+
+import numpy as np
+
+from report_format import parse_number
+
+COLOR_CHART_FILL = "rgba(158, 116, 122, 0.4)"
+COLOR_CHART_STROKE = "rgba(158, 116, 122, 1)"
+
+# (caminho no JSON da avaliação, chave de tradução do rótulo)
+HISTORY_SERIES = [
+    ("peso", "peso_h"),
+    ("dadosCorpo.fmPercentual", "percentualGordura_h"),
+    ("dadosCorpo.fm", "massaGordura_h"),
+    ("dadosCorpo.ffm", "massaLivreGordura_h"),
+    ("dadosCorpo.ssm", "massaMuscularEsqueletica_h"),
+    ("dadosCorpo.tbw", "aguaCorporalL_h"),
+    ("dadosCorpo.icw", "aguaIntracelularL_h"),
+    ("dadosCorpo.ecw", "aguaExtracelularL_h"),
+    ("dadosCorpo.bmi", "imc_h"),
+]
+
+_PATHS = [tuple(path.split(".")) for path, _ in HISTORY_SERIES]
+
+CHART_HEIGHT = 56
+MIN_SLOTS = 6  # o template sempre reserva ao menos 6 posições no histórico
+
+
+def history_matrix(avaliacoes):
+    """Matriz (avaliações x séries) em float, com NaN onde o valor não existe."""
+    # Só os nove caminhos usados: achatar a avaliação inteira (json_normalize)
+    # custava de 8x a 150x mais, por causa dos campos aninhados que não usamos.
+    rows = []
+    for avaliacao in avaliacoes:
+        row = []
+        for parts in _PATHS:
+            value = avaliacao
+            for part in parts:
+                value = value.get(part) if isinstance(value, dict) else None
+            row.append(value)
+        rows.append(row)
+    try:
+        matrix = np.array(rows, dtype=float).reshape(len(rows), len(_PATHS))
+    except (TypeError, ValueError):  # algum valor não numérico: mesmas regras do report_model (``70,5`` vale)
+        return np.array([[_as_float(value) for value in row] for row in rows], dtype=float).reshape(
+            len(rows), len(_PATHS)
+        )
+    matrix[~np.isfinite(matrix)] = np.nan
+    return matrix
+
+
+def _as_float(value):
+    number = parse_number(value)
+    return np.nan if number is None else number
+
+
+def lttb_indices(matrix, threshold):
+    """Índices que o Largest-Triangle-Three-Buckets mantém (sempre o primeiro e o último).
+
+    As séries são normalizadas para 0..1 e a área dos triângulos é somada entre
+    elas: todos os gráficos usam as mesmas avaliações e as colunas continuam
+    alinhadas com as datas.
+    """
+    n = matrix.shape[0]
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1][:max(threshold, 1)])
+    with warnings.catch_warnings(), np.errstate(all="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)
+        lo = np.nanmin(matrix, axis=0)
+        span = np.nanmax(matrix, axis=0) - lo
+        y = (matrix - lo) / np.where(span > 0, span, 1)
+    y = np.nan_to_num(y, nan=0.5)
+    x = np.arange(n, dtype=float)
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        next_start, next_end = end, min(int((i + 2) * every) + 1, n)
+        avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean(axis=0)
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end, None]) * (avg_y - y[a])
+        ).sum(axis=1)
+        a = start + int(np.argmax(area))
+        selected.append(a)
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+def _scale(matrix, top, bottom):
+    """Converte todos os valores em coordenadas y de uma vez (cada série na sua escala)."""
+    with warnings.catch_warnings(), np.errstate(all="ignore"):
+        warnings.simplefilter("ignore", RuntimeWarning)  # séries sem nenhum valor
+        lo = np.nanmin(matrix, axis=0)
+        hi = np.nanmax(matrix, axis=0)
+        span = hi - lo
+        ys = bottom - (matrix - lo) / np.where(span > 0, span, 1) * (bottom - top)
+    ys = np.where(span > 0, ys, (top + bottom) / 2)
+    return np.where(np.isnan(matrix), np.nan, ys)
+
+
+def _sparkline(ys, slots, height):
+    idx = [i for i, y in enumerate(ys) if not np.isnan(y)]
+    if not idx:
+        return ""
+    pts = [(i + 0.5, ys[i]) for i in idx]
+    line = " ".join(f"{x:g},{y:.1f}" for x, y in pts)
+    area = f"{pts[0][0]:g},{height} {line} {pts[-1][0]:g},{height}"
+    markers = "".join(
+        f'<circle cx="{x / slots * 100:.2f}%" cy="{y:.1f}" r="4" fill="#fff" '
+        f'stroke="{COLOR_CHART_STROKE}" stroke-width="2"/>'
+        for x, y in pts
+    )
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="100%" height="{height}" class="sparkline">'
+        f'<svg viewBox="0 0 {slots} {height}" preserveAspectRatio="none" width="100%" height="{height}">'
+        f'<polygon points="{area}" fill="{COLOR_CHART_FILL}" stroke="none"/>'
+        f'<polyline points="{line}" fill="none" stroke="{COLOR_CHART_STROKE}" stroke-width="2" '
+        f'vector-effect="non-scaling-stroke"/>'
+        f"</svg>{markers}</svg>"
+    )
+
+
+def svgs_from_matrix(matrix, height=CHART_HEIGHT):
+    """SVG de cada série de uma ``history_matrix``, indexado pela chave de tradução do rótulo."""
+    slots = max(MIN_SLOTS, matrix.shape[0])
+    ys = _scale(matrix, top=18, bottom=height - 4) if matrix.size else matrix
+    return {key: _sparkline(ys[:, i], slots, height) for i, (_, key) in enumerate(HISTORY_SERIES)}
@@ -0,0 +1,182 @@
+"""Motor do relatório: busca, renderização e exportação.
+
+Único ponto de entrada usado pelas interfaces (``report_frontends`` /
+``app*.py``, ``report_service.py``, ``export_reports.py`` e ``prefetch.py``).
+O estado caro — cache de relatórios, pool de conexões, template pré-compilado
+e imagens codificadas — vive nos módulos importados aqui, uma vez por
+processo, e é compartilhado por todas elas.
+
+``open_report`` devolve também a versão dos dados; com ela, ``report_html`` e
+``report_pdf`` servem os bytes prontos do ``artifact_cache`` sempre que o mesmo
+relatório é aberto ou baixado de novo com as mesmas opções. Quando não há o
+que mostrar, levanta ``ReportError`` dizendo se o relatório não existe ou se a
+API está fora; com a API fora e uma cópia guardada, o ``Report`` sai com
+``status == STALE`` para a interface avisar.
+"""
+from artifact_cache import artifact_cache, artifact_key
+from balanca_api import (
+    FRESH, NOT_FOUND, STALE, UNAVAILABLE, extract_id_from_url, fetch_data, fetch_report, iter_fetch,
+)
+from report_pdf import draw_report, pdf_fingerprint, render_report_pdf, sanitize_filename
+from report_template import CSS_VARIANTS, LANGUAGE, get_template, render_report_html
+from report_view import HISTORY_LAST, HISTORY_MAX_POINTS, select_history
+
+DEFAULT_NAME = "Paciente"
+
+
+class Report:
+    """Relatório carregado: ID, versão dos dados (hash da resposta) e ``report_model.Relatorio``.
+
+    ``status`` é ``FRESH``, ``REVALIDATING`` ou ``STALE`` (ver ``balanca_api``) e
+    ``fetched_at`` (epoch) é quando a API entregou ou confirmou os dados.
+    """
+
+    __slots__ = ("report_id", "version", "data", "status", "fetched_at")
+
+    def __init__(self, report_id, version, data, status=FRESH, fetched_at=None):
+        self.report_id = report_id
+        self.version = version
+        self.data = data
+        self.status = status
+        self.fetched_at = fetched_at
+
+
+class ReportError(LookupError):
+    """Relatório sem dados para mostrar; ``status`` é ``NOT_FOUND`` ou ``UNAVAILABLE``."""
+
+    MESSAGES = {
+        NOT_FOUND: "Relatório não encontrado. Verifique o link ou ID.",
+        UNAVAILABLE: "A API da balança está indisponível no momento. Tente novamente em instantes.",
+    }
+
+    def __init__(self, report_id, status):
+        super().__init__(self.MESSAGES[status])
+        self.report_id = report_id
+        self.status = status
+
+
+# --- BUSCA ---
+
+def open_report(link_or_id, trace_id=None):
+    """``Report`` a partir de um link (``...#ID``) ou ID; ``ReportError`` se não houver dados."""
+    report_id = extract_id_from_url((link_or_id or "").strip())
+    if not report_id:
+        raise ReportError(report_id, NOT_FOUND)
+    return _report(report_id, fetch_report(report_id, trace_id=trace_id))
+
+
+def load_report(link_or_id, trace_id=None):
+    """Só os dados (``report_model.Relatorio``) de ``open_report``; ``None`` se não houver."""
+    try:
+        return open_report(link_or_id, trace_id).data
+    except ReportError:
+        return None
+
+
+def _report(report_id, fetched):
+    if fetched.data is None:
+        raise ReportError(report_id, fetched.status)
+    return Report(report_id, fetched.version, fetched.data, fetched.status, fetched.fetched_at)
+
+
+async def iter_reports(report_ids):
+    """Como ``balanca_api.iter_fetch``, mas gera ``(report_id, Report ou ReportError)``."""
+    async for report_id, fetched in iter_fetch(report_ids, fetch=fetch_report):
+        try:
+            report = _report(report_id, fetched)
+        except ReportError as exc:
+            report = exc
+        yield report_id, report
+
+
+def patient_name(data):
+    return data.paciente.nome or DEFAULT_NAME
+
+
+# --- RENDERIZAÇÃO E EXPORTAÇÃO ---
+
+def history_window(data, **window):
+    """Sub-histórico conforme ``window`` (``last``, ``since``, ``until``, ``max_points``)."""
+    return select_history(data.historico, **window)
+
+
+def render_html(data, variant="viewer", **window):
+    """HTML completo (bytes UTF-8) na variante ``viewer`` (nova aba), ``embed`` ou ``print`` (A4 impresso)."""
+    return render_report_html(data, variant, history_window(data, **window))
+
+
+def render_pdf(data, **window):
+    return render_report_pdf(data, history_window(data, **window))
+
+
+def append_pdf(writer, report, **window):
+    """Acrescenta as páginas do relatório a um ``pdf_writer.PdfWriter`` aberto, com um marcador no nome do paciente.
+
+    Para juntar vários relatórios num só documento: logo, silhueta e fontes
+    entram uma única vez, compartilhados por todas as páginas.
+    """
+    writer.bookmark(patient_name(report.data))
+    draw_report(writer, report.data, history_window(report.data, **window))
+
+
+def pdf_filename(data):
+    return sanitize_filename(patient_name(data))
+
+
+def _window_key(window):
+    """A janela com os padrões explícitos (eles vêm do ambiente e podem mudar entre processos)."""
+    since, until = window.get("since"), window.get("until")
+    return (
+        f"last={window.get('last', HISTORY_LAST)};max={window.get('max_points', HISTORY_MAX_POINTS)};"
+        f"since={since.isoformat() if since else ''};until={until.isoformat() if until else ''}"
+    )
+
+
+def html_key(report, variant="viewer", **window):
+    """Chave do HTML no cache de artefatos: muda sempre que o HTML gerado mudaria."""
+    return artifact_key(
+        "html", report.report_id, report.version,
+        get_template(variant).fingerprint, LANGUAGE, variant, _window_key(window),
+    )
+
+
+def pdf_key(report, **window):
+    """Chave do PDF no cache de artefatos: muda sempre que o PDF gerado mudaria."""
+    return artifact_key("pdf", report.report_id, report.version, pdf_fingerprint(), LANGUAGE, _window_key(window))
+
+
+def report_html(report, variant="viewer", **window):
+    """Como ``render_html``, mas servido do cache de artefatos quando já renderizado."""
+    return artifact_cache.get_or_render(
+        html_key(report, variant, **window), lambda: render_html(report.data, variant, **window), kind="html"
+    )
+
+
+def report_pdf(report, **window):
+    """Como ``render_pdf``, mas servido do cache de artefatos quando já renderizado."""
+    return artifact_cache.get_or_render(
+        pdf_key(report, **window), lambda: render_pdf(report.data, **window), kind="pdf"
+    )
+
+
+def warm_report(report_id):
+    """Deixa um relatório pronto nos caches: dados, HTML das variantes e PDF.
+
+    Usa a janela padrão do histórico, a mesma que as páginas abrem. Levanta
+    ``ReportError`` se não houver dados.
+    """
+    report = open_report(report_id)
+    for variant in CSS_VARIANTS:
+        report_html(report, variant)
+    report_pdf(report)
+    return report
+
+
+def build_pdf(report_id):
+    """Busca e renderiza um relatório; devolve ``(nome_arquivo, pdf_bytes)``.
+
+    Para exportação em lote: renderiza direto, sem passar pelo cache de
+    artefatos (um lote grande o encheria de PDFs que ninguém vai abrir de novo).
+    """
+    report = open_report(report_id)
+    return pdf_filename(report.data), render_pdf(report.data)
@@ -0,0 +1,99 @@
+"""Formatação pt-BR dos valores do relatório (equivalente às funções JS que o template usava)."""
+import math
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+
+
+def _rounded(value, decimals):
+    """Arredonda como o ``toLocaleString``: a partir da representação decimal mais
+    curta do número (``repr``), com metades para longe do zero (``64,25`` → ``64,3``)."""
+    return Decimal(repr(value)).quantize(Decimal(1).scaleb(-decimals), rounding=ROUND_HALF_UP)
+
+
+def _pt_br(text):
+    return text.replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def format_number(value, decimals=1):
+    """Igual a ``formatarNumeroBrasileiro``: até ``decimals`` casas, sem zeros à direita."""
+    if value is None:
+        return ""
+    text = f"{_rounded(value, decimals):,.{decimals}f}"
+    if decimals:
+        text = text.rstrip("0").rstrip(".")
+    return _pt_br(text)
+
+
+def format_decimal(value):
+    """Igual a ``formatarNumeroDecimalBrasileiro``: sempre uma casa decimal."""
+    if value is None:
+        return ""
+    return _pt_br(f"{_rounded(value, 1):,.1f}")
+
+
+def js_round(value):
+    """Igual a ``Math.round``: metades arredondam para cima (``round`` do Python vai para o par)."""
+    return math.floor(value + 0.5)
+
+
+def parse_date(json_date):
+    """``datetime`` de uma data ISO 8601 da API (``Z`` vira UTC); ``None`` se vazia ou inválida."""
+    if isinstance(json_date, datetime):
+        return json_date
+    if not json_date or not isinstance(json_date, str):
+        return None
+    try:
+        return datetime.fromisoformat(json_date.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def parse_number(value):
+    """``int``/``float`` finitos; texto numérico (``70.5`` ou ``70,5``) é convertido; o resto vira ``None``."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value if math.isfinite(value) else None
+    if isinstance(value, str):
+        try:
+            number = float(value.replace(",", "."))
+        except ValueError:
+            return None
+        return number if math.isfinite(number) else None
+    return None
+
+
+def format_date(when):
+    """Igual a ``formatarDataBrasileira``: dd/mm/aaaa HH:MM no fuso do servidor (``when``: ``datetime``; sem data, vazio).
+
+    Datas com fuso (``Z`` da API) são convertidas para o horário local, como
+    fazia o ``new Date()`` do navegador; datas sem fuso já são locais.
+    """
+    if when is None:
+        return ""
+    return when.astimezone().strftime("%d/%m/%Y %H:%M")
+
+
+def calculate_age(birth, on):
+    """Igual a ``calcularIdade``: anos completos em ``on`` usando 365,25 dias por ano.
+
+    ``on`` é a data da avaliação, não a de hoje: assim o HTML/PDF guardado no
+    cache de artefatos continua certo depois do aniversário do paciente.
+    """
+    if birth is None or on is None:
+        return ""
+    return int((on.astimezone().date() - birth.date()).days // 365.25)
+
+
+def format_height(height_cm):
+    """Estatura em metros com vírgula (``1,75m``)."""
+    if height_cm is None:
+        return "---m"
+    meters = height_cm / 100
+    text = str(int(meters)) if meters == int(meters) else repr(meters)
+    return text.replace(".", ",") + "m"
+
+
+def format_sex(sex):
+    """O código 70 (``F``) é feminino; qualquer outro, masculino."""
+    return "Feminino" if sex == 70 else "Masculino"
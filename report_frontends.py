@@ -0,0 +1,315 @@
+"""Páginas Streamlit do relatório, todas sobre o ``report_engine``.
+
+Cada ``app*.py`` é só um atalho para uma destas funções, e ``app_unificado.py``
+serve todas num único processo (``st.navigation``), dividindo cache, pool de
+conexões e template compilado.
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+
+import streamlit as st
+
+import metrics
+import report_engine
+from balanca_api import MAX_CONCURRENCY
+from prefetch import prefetch_queue
+from report_template import COLOR_DARK, COLOR_PRIMARY, to_script_json
+
+# Endpoint /metrics e/ou log periódico, se configurados (REPORT_METRICS_*)
+metrics.start_from_env()
+
+
+# Janelas do histórico oferecidas na interface (filtros de ``select_history``)
+HISTORY_WINDOWS = {
+    "Últimas 6 avaliações": {"last": 6},
+    "Últimas 11 avaliações": {"last": 11},
+    "Últimos 12 meses": {"days": 365},
+    "Histórico completo": {"last": None},
+}
+
+
+def _history_window(**kwargs):
+    """Seletor da janela do histórico; devolve os filtros para o ``report_engine``."""
+    opcao = st.selectbox(
+        "Histórico",
+        list(HISTORY_WINDOWS),
+        index=1,
+        help="Com mais de 11 avaliações na janela, os gráficos mostram as 11 que melhor preservam a forma das curvas.",
+        **kwargs,
+    )
+    window = dict(HISTORY_WINDOWS[opcao])
+    if "days" in window:
+        window = {"since": date.today() - timedelta(days=window["days"])}
+    return window
+
+
+def _stale_warning(report):
+    """Avisa quando a API falhou e o relatório saiu da última cópia guardada."""
+    if report.status == report_engine.STALE:
+        quando = datetime.fromtimestamp(report.fetched_at).strftime("%d/%m/%Y %H:%M")
+        st.warning(
+            f"A API da balança não respondeu: exibindo os dados obtidos em {quando}, que podem estar desatualizados."
+        )
+
+
+# --- ABERTURA E IMPRESSÃO NATIVA (Blob URL) ---
+
+def _blob_buttons(html_content, buttons, compact=False):
+    """Componente com botões que abrem o HTML (bytes) numa nova aba; ``(rótulo, imprimir)`` por botão.
+
+    Com ``imprimir``, a aba abre a caixa de impressão do navegador assim que a
+    página e as fontes carregam: o ``@media print`` do template a deixa em A4
+    e "Salvar como PDF" gera um PDF com texto e gráficos vetoriais.
+    """
+    # --- TÉCNICA DO BLOB URL (PARA EVITAR ABOUT:BLANK E MANTER CODIFICAÇÃO CORRETA) ---
+    # O HTML vai como string JS em UTF-8 cru (sem Base64): o navegador monta o Blob
+    # direto da string, sem atob nem cópia byte a byte, e só na primeira abertura.
+    html_literal = to_script_json(html_content.decode('utf-8'))
+    botoes = "".join(
+        f'<button onclick="openBlobReport({str(imprimir).lower()})" class="btn-open">{rotulo}</button>'
+        for rotulo, imprimir in buttons
+    )
+    return f"""
+        <script>
+            var reportHtml = {html_literal};
+            var blobUrl = null;
+            function openBlobReport(imprimir) {{
+                if (!blobUrl) {{
+                    var blob = new Blob([reportHtml], {{type: 'text/html;charset=utf-8'}});
+                    blobUrl = URL.createObjectURL(blob);
+                }}
+
+                // Abre em nova aba
+                var janela = window.open(blobUrl, '_blank');
+                if (imprimir && janela) {{
+                    janela.addEventListener('load', function () {{
+                        janela.document.fonts.ready.then(function () {{ janela.print(); }});
+                    }});
+                }}
+            }}
+        </script>
+
+        <style>
+            .btn-open {{
+                background-color: {COLOR_PRIMARY};
+                color: white;
+                padding: {"8px 12px" if compact else "15px 30px"};
+                text-align: center;
+                text-decoration: none;
+                display: inline-block;
+                font-size: {"14px" if compact else "18px"};
+                font-weight: bold;
+                border-radius: 8px;
+                border: none;
+                box-shadow: 0 4px 6px rgba(0,0,0,0.1);
+                font-family: sans-serif;
+                cursor: pointer;
+                width: 100%;
+            }}
+            .btn-open:hover {{
+                background-color: {COLOR_DARK};
+            }}
+            .container {{
+                display: flex;
+                flex-direction: column;
+                gap: 10px;
+                justify-content: center;
+                margin-top: {"0" if compact else "20px"};
+            }}
+        </style>
+
+        <div class="container">
+            {botoes}
+        </div>
+        """
+
+
+# --- VISUALIZADOR (app.py / app_rsv2.py) ---
+
+@metrics.traced("page.viewer")
+def viewer_page():
+    """Gera o relatório e o abre em nova aba (página A4)."""
+    st.set_page_config(layout="centered", page_title="Gerador de Relatórios")
+
+    st.title("Visualizador de Relatórios")
+
+    url_input = st.text_input(
+        "Link do Relatório",
+        placeholder="Cole aqui o link completo e pressione Enter",
+        help="Cole o link (ex: ...#123-abc) e aperte Enter."
+    )
+    window = _history_window()
+
+    if not report_engine.extract_id_from_url(url_input):
+        return
+
+    with st.spinner('Gerando visualização...'):
+        try:
+            report = report_engine.open_report(url_input)
+        except report_engine.ReportError as exc:
+            st.error(str(exc))
+            return
+
+        nome_paciente = report_engine.patient_name(report.data)
+
+        # HTML completo (bytes UTF-8), do cache de artefatos se esta versão já foi gerada
+        html_content = report_engine.report_html(report, "viewer", **window)
+
+        with metrics.span("emit.pack"):
+            opener_script = _blob_buttons(
+                html_content, [("📄 ABRIR RELATÓRIO EM NOVA ABA", False), ("🖨️ IMPRIMIR / SALVAR PDF", True)]
+            )
+
+        st.success(f"Relatório de **{nome_paciente}** preparado com sucesso!")
+        _stale_warning(report)
+
+        # Renderiza o botão e o script que faz a mágica do Blob
+        with metrics.span("emit.component"):
+            st.components.v1.html(opener_script, height=160)
+
+
+# --- RELATÓRIO EMBUTIDO + PDF (app_reserva.py) ---
+
+@metrics.traced("page.embed")
+def embed_page():
+    """Relatório responsivo dentro do Streamlit, com download do PDF vetorial e impressão."""
+    st.set_page_config(layout="wide", page_title="Relatório de Avaliação")
+
+    col_input, col_window, col_btn = st.columns([3, 1, 1])
+
+    # 1. Interface de Input
+    with col_input:
+        url_input = st.text_input(
+            "Link do Relatório",
+            placeholder="Cole aqui o link completo (Ex: https://...#CODIGO-DO-RELATORIO)",
+            label_visibility="collapsed"
+        )
+    with col_window:
+        window = _history_window(label_visibility="collapsed")
+
+    report = None
+
+    # 2. Lógica de Busca e Botão
+    if report_engine.extract_id_from_url(url_input):
+        with st.spinner('Carregando dados...'):
+            try:
+                report = report_engine.open_report(url_input)
+            except report_engine.ReportError as exc:
+                st.error(str(exc))
+
+        if report:
+            # Mostra o botão apenas se os dados existirem; o PDF vetorial é gerado no
+            # servidor uma vez por versão do relatório (depois vem do cache de artefatos)
+            with col_btn:
+                st.download_button(
+                    "Baixar PDF",
+                    data=report_engine.report_pdf(report, **window),
+                    file_name=report_engine.pdf_filename(report.data),
+                    mime="application/pdf",
+                    type="primary",
+                    use_container_width=True,
+                )
+                # Alternativa: a impressão do próprio navegador, a partir da variante A4
+                print_html = report_engine.report_html(report, "print", **window)
+                with metrics.span("emit.component"):
+                    st.components.v1.html(_blob_buttons(print_html, [("🖨️ Imprimir", True)], compact=True), height=45)
+            _stale_warning(report)
+    else:
+        with col_btn:
+            st.button("Baixar PDF", disabled=True, use_container_width=True)
+
+    # 3. Geração do Relatório
+    if report:
+        # Template pré-compilado + dados deste relatório (ou o HTML já pronto em cache)
+        html_content = report_engine.report_html(report, "embed", **window).decode("utf-8")
+        with metrics.span("emit.component"):
+            st.components.v1.html(html_content, height=1400, scrolling=True)
+
+
+# --- COMPARAÇÃO DE VÁRIOS RELATÓRIOS (app_comparar.py) ---
+
+async def _carregar_relatorios(report_ids, slots):
+    """Preenche o espaço de cada relatório assim que a resposta dele chega."""
+    carregados = 0
+    async for report_id, report in report_engine.iter_reports(report_ids):
+        with slots[report_id].container():
+            if isinstance(report, report_engine.ReportError):
+                st.error(f"`{report_id}`: {report}")
+                continue
+            carregados += 1
+            st.subheader(report_engine.patient_name(report.data))
+            _stale_warning(report)
+            html_content = report_engine.report_html(report, "embed").decode("utf-8")
+            with metrics.span("emit.component"):
+                st.components.v1.html(html_content, height=1400, scrolling=True)
+    return carregados
+
+
+@metrics.traced("page.compare")
+def compare_page():
+    """Vários relatórios lado a lado, buscados em paralelo e exibidos conforme chegam."""
+    st.set_page_config(layout="wide", page_title="Comparar Relatórios")
+
+    st.title("Comparar Relatórios")
+
+    links_input = st.text_area(
+        "Links dos Relatórios",
+        placeholder="Cole um link (ou ID) por linha",
+        help=f"Os relatórios são buscados em paralelo ({MAX_CONCURRENCY} por vez) e exibidos assim que chegam.",
+        height=150,
+    )
+    colunas = st.radio("Relatórios por linha", [1, 2, 3], index=1, horizontal=True)
+
+    # IDs na ordem em que foram colados, sem repetidos
+    report_ids = list(dict.fromkeys(
+        report_id
+        for report_id in map(report_engine.extract_id_from_url, (line.strip() for line in links_input.splitlines()))
+        if report_id
+    ))
+    if not report_ids:
+        return
+
+    # Reserva o lugar de cada relatório na ordem da lista, antes de buscar qualquer um
+    slots = {}
+    for inicio in range(0, len(report_ids), colunas):
+        for col, report_id in zip(st.columns(colunas), report_ids[inicio:inicio + colunas]):
+            with col:
+                slots[report_id] = st.empty()
+                slots[report_id].info(f"Carregando `{report_id}`...")
+
+    carregados = asyncio.run(_carregar_relatorios(report_ids, slots))
+    st.caption(f"{carregados} de {len(report_ids)} relatório(s) carregado(s).")
+
+
+# --- PRÉ-CARREGAMENTO DA AGENDA DO DIA (app_unificado.py) ---
+
+@metrics.traced("page.prefetch")
+def prefetch_page():
+    """Enfileira os relatórios das consultas do dia para que abram já prontos."""
+    st.set_page_config(layout="centered", page_title="Agenda do Dia")
+
+    st.title("Agenda do Dia")
+
+    links_input = st.text_area(
+        "Links dos Relatórios",
+        placeholder="Cole um link (ou ID) por linha",
+        help="Os relatórios são buscados e renderizados em segundo plano; ao abrir o link, já estarão prontos.",
+        height=150,
+    )
+    report_ids = list(dict.fromkeys(
+        report_id
+        for report_id in map(report_engine.extract_id_from_url, (line.strip() for line in links_input.splitlines()))
+        if report_id
+    ))
+    if st.button("Pré-carregar", type="primary", disabled=not report_ids):
+        adicionados = prefetch_queue.submit(report_ids)
+        st.success(f"{adicionados} relatório(s) adicionado(s) à fila.")
+
+    stats = prefetch_queue.stats()
+    col_fila, col_andamento, col_prontos, col_falhas = st.columns(4)
+    col_fila.metric("Na fila", stats["queued"], help=f"O mais antigo aguarda há {stats['lag']:.0f}s.")
+    col_andamento.metric("Em andamento", stats["running"])
+    col_prontos.metric("Prontos", stats["done"])
+    col_falhas.metric("Falhas", stats["failed"])
+    for report_id, exc in reversed(prefetch_queue.failures):
+        st.caption(f"`{report_id}`: {exc}")
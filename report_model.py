@@ -0,0 +1,257 @@
+"""Modelo tipado dos dados do relatório, montado uma única vez a partir da API.
+
+A resposta de ``/Relatorio/{id}`` traz o histórico inteiro de avaliações, cada
+uma com dezenas de campos aninhados, mas o relatório só usa a última avaliação
+em detalhe e nove séries numéricas das demais. ``parse_report`` valida e
+converte só isso:
+
+- paciente, usuário, faixas de normalidade e a última avaliação viram objetos
+  com ``__slots__`` (campos com nome fixo, sem o dict de cada instância);
+- o histórico vira colunas: as datas e uma matriz numpy (avaliações x séries),
+  com NaN nas lacunas.
+
+Números chegam como ``int``/``float`` (texto numérico é convertido; o resto
+vira ``None``), datas como ``datetime`` (texto fora do ISO 8601 vira ``None``)
+e textos como ``str``. Os renderizadores acessam atributos em
+vez de percorrer caminhos como ``"dadosCorpo.fm"`` a cada valor.
+"""
+from datetime import datetime
+
+import numpy as np
+
+from report_charts import HISTORY_SERIES, history_matrix
+from report_format import parse_date, parse_number
+
+LIMBS = 5  # braço dir., braço esq., tronco, perna dir., perna esq.
+
+
+# --- CONVERSORES ---
+
+# ``int``/``float`` finitos; texto numérico (com ponto ou vírgula) é convertido; o resto vira ``None``
+_number = parse_number
+
+
+def _text(value):
+    """Texto; números viram texto e estruturas (dict/lista) são descartadas."""
+    if value is None or isinstance(value, (dict, list, bool)):
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+def _date(value):
+    """``datetime`` de uma data ISO 8601; qualquer outra coisa vira ``None``."""
+    return parse_date(value) if isinstance(value, str) else None
+
+
+def _code(value):
+    """Código escalar (ex.: sexo ``70``), mantido como veio."""
+    return value if isinstance(value, (str, int, float)) and not isinstance(value, bool) else None
+
+
+def _dict(value):
+    return value if isinstance(value, dict) else {}
+
+
+# --- REGISTROS ---
+
+class Record:
+    """Base dos registros: ``FIELDS`` liga cada atributo à chave da API e ao conversor."""
+
+    __slots__ = ()
+    FIELDS = ()  # (atributo, chave na API, conversor)
+
+    @classmethod
+    def parse(cls, raw):
+        raw = _dict(raw)
+        record = cls.__new__(cls)
+        for attr, key, convert in cls.FIELDS:
+            setattr(record, attr, convert(raw.get(key)))
+        return record
+
+    def to_json(self):
+        """Campos preenchidos, com as chaves da API (o formato que o template lê)."""
+        values = {}
+        for attr, key, _ in self.FIELDS:
+            value = getattr(self, attr)
+            if value is not None:
+                values[key] = value.isoformat() if isinstance(value, datetime) else value
+        return values
+
+    def __repr__(self):
+        values = ", ".join(f"{attr}={getattr(self, attr)!r}" for attr, _, _ in self.FIELDS)
+        return f"{type(self).__name__}({values})"
+
+
+class Paciente(Record):
+    __slots__ = ("nome", "sexo", "estatura_cm", "data_nascimento", "email")
+    FIELDS = (
+        ("nome", "nome", _text),
+        ("sexo", "sexo", _code),
+        ("estatura_cm", "estaturaCm", _number),
+        ("data_nascimento", "dataNascimento", _date),
+        ("email", "email", _text),
+    )
+
+
+class Usuario(Record):
+    """Profissional/clínica que emite o relatório (cabeçalho)."""
+
+    __slots__ = (
+        "nome", "endereco", "complemento", "cep", "municipio", "uf",
+        "clinica_nome", "clinica_endereco", "clinica_complemento", "clinica_cep", "clinica_municipio", "clinica_uf",
+    )
+    FIELDS = (
+        ("nome", "nome", _text),
+        ("endereco", "endereco", _text),
+        ("complemento", "complemento", _text),
+        ("cep", "cep", _text),
+        ("municipio", "municipio", _text),
+        ("uf", "uf", _text),
+        ("clinica_nome", "clinicaNome", _text),
+        ("clinica_endereco", "clinicaEndereco", _text),
+        ("clinica_complemento", "clinicaComplemento", _text),
+        ("clinica_cep", "clinicaCEP", _text),
+        ("clinica_municipio", "clinicaMunicipio", _text),
+        ("clinica_uf", "clinicaUF", _text),
+    )
+
+
+class Faixa(Record):
+    """Faixa de normalidade de uma medida."""
+
+    __slots__ = ("minimo", "maximo")
+    FIELDS = (("minimo", "minimo", _number), ("maximo", "maximo", _number))
+
+
+class Normalidades(Record):
+    __slots__ = ("peso", "fm_perc", "fm_kg", "ffm_kg", "tbw", "bmi")
+    FIELDS = (
+        ("peso", "peso", Faixa.parse),
+        ("fm_perc", "fmPerc", Faixa.parse),
+        ("fm_kg", "fmKg", Faixa.parse),
+        ("ffm_kg", "ffmKg", Faixa.parse),
+        ("tbw", "tbw", Faixa.parse),
+        ("bmi", "bmi", Faixa.parse),
+    )
+
+    def to_json(self):
+        return {key: getattr(self, attr).to_json() for attr, key, _ in self.FIELDS}
+
+
+class Corpo(Record):
+    """Composição corporal da avaliação (só os campos exibidos em detalhe)."""
+
+    __slots__ = ("fm_percentual", "fm", "ffm", "tbw", "bmi", "indice_apendicular", "vfl")
+    FIELDS = (
+        ("fm_percentual", "fmPercentual", _number),
+        ("fm", "fm", _number),
+        ("ffm", "ffm", _number),
+        ("tbw", "tbw", _number),
+        ("bmi", "bmi", _number),
+        ("indice_apendicular", "indiceApendicular", _number),
+        ("vfl", "vfl", _number),
+    )
+
+
+class Membro(Record):
+    """Massa magra e gordura de um segmento (``composicaoCorporal`` na API)."""
+
+    __slots__ = ("ffm", "fm")
+    FIELDS = (("ffm", "ffm", _number), ("fm", "fm", _number))
+
+    @classmethod
+    def parse(cls, raw):
+        return super().parse(_dict(raw).get("composicaoCorporal"))
+
+
+def _membros(value):
+    return tuple(Membro.parse(membro) for membro in (value if isinstance(value, list) else [])[:LIMBS])
+
+
+class Avaliacao(Record):
+    """Avaliação exibida em detalhe (a mais recente)."""
+
+    __slots__ = ("data", "peso", "taxa_metabolica_basal", "idade_metabolica", "corpo", "membros")
+    FIELDS = (
+        ("data", "data", _date),
+        ("peso", "peso", _number),
+        ("taxa_metabolica_basal", "taxaMetabolicaBasal", _number),
+        ("idade_metabolica", "idadeMetabolica", _number),
+        ("corpo", "dadosCorpo", Corpo.parse),
+        ("membros", "dadosMembros", _membros),
+    )
+
+    def membro(self, indice):
+        """Segmento ``indice`` (vazio se a balança não mandou)."""
+        return self.membros[indice] if indice < len(self.membros) else _SEM_MEMBRO
+
+    def to_json(self):
+        values = super().to_json()
+        values["dadosCorpo"] = self.corpo.to_json()
+        values["dadosMembros"] = [membro.to_json() for membro in self.membros]
+        return values
+
+
+_SEM_MEMBRO = Membro.parse(None)
+
+
+class Historico:
+    """Histórico em colunas: ``datas`` (``datetime`` ou ``None``) e ``valores``
+    (avaliações x ``HISTORY_SERIES``, NaN nas lacunas)."""
+
+    __slots__ = ("datas", "valores")
+
+    def __init__(self, datas, valores):
+        self.datas = tuple(datas)
+        self.valores = valores
+
+    @classmethod
+    def parse(cls, avaliacoes):
+        avaliacoes = avaliacoes if isinstance(avaliacoes, list) else []
+        return cls(
+            (_date(avaliacao.get("data")) if isinstance(avaliacao, dict) else None for avaliacao in avaliacoes),
+            history_matrix(avaliacoes),
+        )
+
+    def __len__(self):
+        return len(self.datas)
+
+    def take(self, indices):
+        """Sub-histórico com as avaliações de ``indices`` (na ordem dada)."""
+        indices = list(indices)
+        return Historico([self.datas[i] for i in indices], self.valores[indices])
+
+    def series(self):
+        """Valores de cada série (por caminho de ``HISTORY_SERIES``), com ``None`` nas lacunas."""
+        columns = np.where(np.isnan(self.valores), None, self.valores).T.tolist() if self.valores.size else None
+        return {
+            path: columns[i] if columns else []
+            for i, (path, _) in enumerate(HISTORY_SERIES)
+        }
+
+
+class Relatorio:
+    """Dados de um relatório, prontos para os renderizadores (compartilhados: não alterar)."""
+
+    __slots__ = ("paciente", "usuario", "normalidades", "ultima", "historico")
+
+    def __init__(self, paciente, usuario, normalidades, ultima, historico):
+        self.paciente = paciente
+        self.usuario = usuario
+        self.normalidades = normalidades
+        self.ultima = ultima
+        self.historico = historico
+
+
+def parse_report(raw):
+    """``Relatorio`` a partir do JSON decodificado; ``ValueError`` se não for um objeto."""
+    if not isinstance(raw, dict):
+        raise ValueError(f"resposta inesperada da API: {type(raw).__name__}")
+    avaliacoes = raw.get("avaliacoes") if isinstance(raw.get("avaliacoes"), list) else []
+    return Relatorio(
+        paciente=Paciente.parse(raw.get("paciente")),
+        usuario=Usuario.parse(raw.get("user")),
+        normalidades=Normalidades.parse(raw.get("normalidades")),
+        ultima=Avaliacao.parse(avaliacoes[-1] if avaliacoes else None),
+        historico=Historico.parse(avaliacoes),
+    )
@@ -0,0 +1,340 @@
+"""Renderização do relatório em PDF vetorial no servidor.
+
+Reproduz o layout do template HTML (mesmas cores, grades e seções) direto a
+partir do ``report_model.Relatorio``: texto selecionável, barras e gráficos
+vetoriais, sem html2canvas/jsPDF no navegador.
+"""
+import hashlib
+import io
+import os
+import re
+
+import metrics
+from assets import asset_store
+from pdf_writer import Canvas, PdfWriter, blend, text_width
+from report_charts import HISTORY_SERIES
+from report_format import calculate_age, format_date, format_decimal, format_height, format_number, format_sex, js_round
+from report_view import select_history
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Incrementar sempre que o layout do PDF gerado mudar
+PDF_VERSION = "7"
+LOGO_PATH = os.path.join(BASE_DIR, "logoTKE.png")
+CORPO_PATH = os.path.join(BASE_DIR, "corpo.png")
+
+# --- DEFINIÇÃO DE CORES (as mesmas do template HTML) ---
+COLOR_PRIMARY = "#9e747a"
+COLOR_BG = "#f5f1f2"
+COLOR_DARK = "#72464e"
+COLOR_LIGHT = "#e2d5d7"
+COLOR_WHITE = "#ffffff"
+COLOR_CHART_FILL = blend(COLOR_PRIMARY, COLOR_BG, 0.4)
+
+# Largura da página em px CSS (o #container tem 793px = A4 a 96 dpi)
+PAGE_W = 793
+PAGE_H = 1122
+MARGIN = 20
+INNER_X = MARGIN + 20
+INNER_W = PAGE_W - 2 * INNER_X
+
+# (rótulo, faixa em ``Normalidades``, campo em ``Corpo``; ``None`` = peso da avaliação)
+NORMALIDADES = [
+    ("Peso", "peso", None),
+    ("Percentual de Gordura", "fm_perc", "fm_percentual"),
+    ("Massa de Gordura", "fm_kg", "fm"),
+    ("Massa Livre de Gordura", "ffm_kg", "ffm"),
+    ("Água Corporal", "tbw", "tbw"),
+    ("IMC", "bmi", "bmi"),
+]
+
+HISTORY_LABELS = {
+    "peso": "Peso (kg)",
+    "dadosCorpo.fmPercentual": "Percentual de Gordura (%)",
+    "dadosCorpo.fm": "Massa de Gordura (kg)",
+    "dadosCorpo.ffm": "Massa Livre de Gordura (kg)",
+    "dadosCorpo.ssm": "Massa Muscular Esquelética (kg)",
+    "dadosCorpo.tbw": "Água Corporal (L)",
+    "dadosCorpo.icw": "Água Intracelular (L)",
+    "dadosCorpo.ecw": "Água Extracelular (L)",
+    "dadosCorpo.bmi": "IMC",
+}
+HISTORY_COLUMNS = 11
+
+
+def sanitize_filename(name):
+    """Limpa o nome para ser usado em arquivo (remove acentos e caracteres ilegais)."""
+    clean_name = re.sub(r'[^\w\s-]', '', name).strip().replace(' ', '_')
+    return f"RELATORIO_{clean_name}.pdf"
+
+
+def _wrap(text, size, width):
+    """Quebra ``text`` em linhas que cabem em ``width`` px (fonte em negrito)."""
+    linhas, linha = [], ""
+    for palavra in text.split():
+        tentativa = f"{linha} {palavra}".strip()
+        if linha and text_width(tentativa, size, "F2") > width:
+            linhas.append(linha)
+            tentativa = palavra
+        linha = tentativa
+    linhas.append(linha)
+    return linhas
+
+
+def _h1(c, x, y, text, size=20):
+    c.text(x, y + size, text, size=size, bold=True, color=COLOR_PRIMARY)
+    return y + size + 14
+
+
+def _bar(c, y):
+    c.rect(MARGIN + 2, y, PAGE_W - 2 * MARGIN - 4, 5, fill=COLOR_PRIMARY)
+    return y + 5
+
+
+def _draw_header(c, relatorio):
+    user = relatorio.usuario
+    logo_w, logo_h = c.writer.image_size(LOGO_PATH)
+    c.image(LOGO_PATH, MARGIN, 20, 80 * logo_w / logo_h, 80)
+    if user.clinica_nome:
+        nome = user.clinica_nome
+        linha1 = f"{user.clinica_endereco or ''} {user.clinica_complemento or ''}"
+        linha2 = f"{user.clinica_cep or ''} - {user.clinica_municipio or ''} - {user.clinica_uf or ''}"
+    else:
+        nome = user.nome or ""
+        linha1 = f"{user.endereco or ''} {user.complemento or ''}"
+        linha2 = f"{user.cep or ''} - {user.municipio or ''} - {user.uf or ''}"
+    right = PAGE_W - MARGIN
+    c.text(right, 44, nome, size=16, bold=True, color=COLOR_DARK, align="right")
+    c.text(right, 64, linha1.strip(), size=13, color=COLOR_DARK, align="right")
+    c.text(right, 82, linha2, size=13, color=COLOR_DARK, align="right")
+    return 110
+
+
+def _draw_paciente(c, relatorio, ultima, y):
+    paciente = relatorio.paciente
+    col_w = (INNER_W - 20) / 3.6
+    cols = [INNER_X, INNER_X + 2 * col_w + 10, INNER_X + 2.8 * col_w + 20]
+    linhas = [
+        [("Nome: ", paciente.nome), ("Estatura: ", format_height(paciente.estatura_cm)),
+         ("Data: ", format_date(ultima.data))],
+        [("E-mail: ", paciente.email), ("Sexo: ", format_sex(paciente.sexo)),
+         ("Idade: ", calculate_age(paciente.data_nascimento, ultima.data))],
+    ]
+    for row, itens in enumerate(linhas):
+        base = y + 24 + row * 20
+        for x, (label, valor) in zip(cols, itens):
+            c.text(x, base, label, size=13, bold=True, color=COLOR_DARK)
+            c.text(x + text_width(label, 13, "F2"), base, "" if valor is None else valor, size=13)
+    return _bar(c, y + 64)
+
+
+def _draw_normalidades(c, relatorio, ultima, y):
+    y = _h1(c, INNER_X, y + 10, "Análise Global Resumida")
+    fr = (INNER_W - 130 - 9) / 10.1
+    widths = [130, 2.3 * fr, 1.8 * fr, 6 * fr]
+    xs = [INNER_X]
+    for w in widths[:-1]:
+        xs.append(xs[-1] + w + 3)
+    headers = [("", COLOR_LIGHT, COLOR_DARK), ("Abaixo", COLOR_PRIMARY, COLOR_WHITE),
+               ("Normal", COLOR_LIGHT, COLOR_DARK), ("Acima", COLOR_PRIMARY, COLOR_WHITE)]
+    for x, w, (label, bg, fg) in zip(xs, widths, headers):
+        c.rect(x, y, w, 27, fill=bg)
+        c.text(x + w / 2, y + 20, label, size=16, bold=True, color=fg, align="center")
+    y += 30
+    graph_x = xs[1]
+    graph_w = INNER_X + INNER_W - graph_x
+    for label, faixa, campo in NORMALIDADES:
+        c.rect(INNER_X, y, 130, 49, fill=COLOR_PRIMARY)
+        linhas = _wrap(label, 13, 120)
+        for n, texto in enumerate(linhas):
+            c.text(INNER_X + 5, y + 29 - 8 * (len(linhas) - 1) + n * 16, texto, size=13, bold=True, color=COLOR_WHITE)
+        c.rect(graph_x, y, graph_w, 3, fill=COLOR_DARK)
+        c.rect(graph_x, y, 3, 49, fill=COLOR_DARK)
+        normalidade = getattr(relatorio.normalidades, faixa)
+        minimo, maximo = normalidade.minimo, normalidade.maximo
+        valor = ultima.peso if campo is None else getattr(ultima.corpo, campo)
+        if minimo is not None and maximo is not None:
+            passo = (maximo - minimo) / 2
+            cel = (graph_w - 3) / 11
+            for i in range(11):
+                cx = graph_x + 3 + cel * i + cel / 2
+                c.rect(cx - 1, y + 3, 2, 5, fill=COLOR_DARK)
+                c.text(cx, y + 19, format_number(minimo + (i - 2) * passo, 1), size=11, color=COLOR_DARK, align="center")
+            if valor is not None and maximo != minimo:
+                percentual = (valor - minimo) * (41 - 23) / (maximo - minimo) + 23
+                largura = min(max(js_round(percentual), 0) / 100 * graph_w, graph_w - 70)
+                c.rect(graph_x + 3, y + 26, largura, 15, fill=COLOR_DARK)
+                c.text(graph_x + 3 + largura + 10, y + 40, format_decimal(valor), size=18, bold=True, color=COLOR_DARK)
+        y += 52
+    return _bar(c, y + 6)
+
+
+def _draw_membros(c, ultima, y):
+    peso = ultima.peso or 0
+    col_w = (INNER_W - 10) / 2
+    c.rect(PAGE_W / 2 - 2.5, y + 15, 5, 334, fill=COLOR_PRIMARY)
+    img_w, img_h = c.writer.image_size(CORPO_PATH)
+
+    def valores(indice, campo):
+        kg = getattr(ultima.corpo if indice is None else ultima.membro(indice), campo)
+        if kg is None:
+            return "-", "-"
+        return format_decimal(kg) + "kg", (format_number(kg / peso * 100) + "%") if peso else "-"
+
+    for coluna, (titulo, campo) in enumerate([("Análise de Massa Magra", "ffm"), ("Análise de Gordura", "fm")]):
+        x0 = INNER_X + coluna * (col_w + 10)
+        top = _h1(c, x0, y + 10, titulo)
+        box_h = 320
+        draw_h = box_h
+        draw_w = draw_h * img_w / img_h
+        c.image(CORPO_PATH, x0 + (col_w - draw_w) / 2, top, draw_w, draw_h)
+        lado = (col_w - 170) / 2
+        direita = x0 + lado
+        esquerda = x0 + lado + 170 + 10
+        centro = x0 + lado + 10 + 75
+        c.text(direita, top + 19, "Direito", size=19, bold=True, color=COLOR_LIGHT, align="right")
+        c.text(esquerda, top + 19, "Esquerdo", size=19, bold=True, color=COLOR_LIGHT)
+        for membro, indice, dy, x, align in [
+            ("Braço", 0, 46, direita, "right"), ("Tronco", 2, 124, direita, "right"),
+            ("Perna", 3, 235, direita, "right"), ("Braço", 1, 46, esquerda, "left"),
+            ("Perna", 4, 234, esquerda, "left"),
+        ]:
+            kg, pct = valores(indice, campo)
+            c.text(x, top + dy, membro, size=14, bold=True, align=align)
+            c.text(x, top + dy + 17, kg, size=14, align=align)
+            c.text(x, top + dy + 34, pct, size=14, align=align)
+        kg, pct = valores(None, campo)
+        c.text(centro, top + 82, kg, size=14, align="center")
+        c.text(centro, top + 99, pct, size=14, align="center")
+    return _bar(c, y + 44 + 320 + 12)
+
+
+def _draw_adicionais(c, ultima, y):
+    corpo = ultima.corpo
+    col_w = (INNER_W - 10) / 2
+    top = y + 10
+    c.text(INNER_X, top + 15, "Dados Adicionais", size=15, bold=True, color=COLOR_PRIMARY)
+    tmb = ultima.taxa_metabolica_basal
+    ia = corpo.indice_apendicular
+    idade = ultima.idade_metabolica
+    linhas = [
+        ("Taxa Metabólica Basal", f"{format_number(tmb, 0)} kcal" if tmb is not None else "--- kcal"),
+        ("Índice Apendicular", f"{format_number(ia, 2)} kg/m²" if ia is not None else "---"),
+        ("Idade Metabólica", f"{idade} anos" if idade is not None else "---"),
+    ]
+    row_y = top + 28
+    for label, valor in linhas:
+        c.rect(INNER_X, row_y, 106, 30, fill=COLOR_LIGHT)
+        c.text(INNER_X + 5, row_y + 19, label, size=10, bold=True, color=COLOR_DARK)
+        c.rect(INNER_X + 110, row_y, col_w - 110, 30, fill=COLOR_PRIMARY)
+        c.text(INNER_X + 110 + (col_w - 110) / 2, row_y + 21, valor, size=16, bold=True, color=COLOR_WHITE, align="center")
+        row_y += 34
+
+    x0 = INNER_X + col_w + 10
+    c.text(x0, top + 15, "Nível de Gordura Visceral", size=15, bold=True, color=COLOR_PRIMARY)
+    vfl = corpo.vfl
+    c.rect(x0, top + 28, col_w, 22, fill=COLOR_LIGHT)
+    c.text(x0 + col_w / 2, top + 44, f"Nível {format_number(vfl, 0)}" if vfl is not None else "Nível",
+           size=13, bold=True, color=COLOR_DARK, align="center")
+    c.text(x0, top + 68, "Abaixo", size=12)
+    c.text(x0 + col_w / 2, top + 68, "10", size=14, bold=True, align="center")
+    c.text(x0 + col_w, top + 68, "Acima", size=12, align="right")
+    c.line(x0, top + 76, x0 + col_w, top + 76, COLOR_DARK)
+    c.line(x0, top + 76, x0, top + 90, COLOR_DARK)
+    if vfl is not None:
+        c.rect(x0 + 1, top + 80, min(js_round(vfl / 20 * 100), 100) / 100 * (col_w - 1), 7, fill=COLOR_DARK)
+    return row_y + 10
+
+
+def _draw_historico(c, historico, y):
+    y = _h1(c, INNER_X, y + 10, "Histórico da composição Corporal")
+    historico = historico.take(range(max(len(historico) - HISTORY_COLUMNS, 0), len(historico)))
+    label_w = 110
+    grid_x = INNER_X + label_w + 5
+    grid_w = INNER_X + INNER_W - grid_x
+    cel = grid_w / HISTORY_COLUMNS
+    for i, data in enumerate(historico.datas):
+        x = grid_x + i * cel
+        c.rect(x + 1.5, y, cel - 3, 20, fill=COLOR_LIGHT)
+        if data:
+            c.text(x + cel / 2, y + 14, format_date(data)[:10], size=9, bold=True, color=COLOR_DARK, align="center")
+    y += 25
+    row_h = 56
+    series = historico.series()
+    for caminho, _ in HISTORY_SERIES:
+        label = HISTORY_LABELS[caminho]
+        c.rect(INNER_X, y, label_w, row_h, fill=COLOR_PRIMARY)
+        for n, texto in enumerate(_wrap(label, 12, label_w - 16)):
+            c.text(INNER_X + 8, y + 20 + n * 14, texto, size=12, bold=True, color=COLOR_WHITE)
+        valores = series[caminho]
+        for i in range(HISTORY_COLUMNS):
+            x = grid_x + (i + 1) * cel
+            c.line(x, y, x, y + row_h, COLOR_LIGHT, line_width=2, dash=4)
+        pontos = [(grid_x + i * cel + cel / 2, v) for i, v in enumerate(valores) if v is not None]
+        if pontos:
+            vs = [v for _, v in pontos]
+            lo, hi = min(vs), max(vs)
+            span = (hi - lo) or 1
+            topo, base = y + 20, y + row_h - 4
+            xy = [(px, base - (v - lo) / span * (base - topo) if hi != lo else (topo + base) / 2) for px, v in pontos]
+            c.polygon([(xy[0][0], base)] + xy + [(xy[-1][0], base)], fill=COLOR_CHART_FILL)
+            if len(xy) > 1:
+                c.polygon(xy, stroke=COLOR_PRIMARY, line_width=2, close=False)
+            for px, py in xy:
+                c.circle(px, py, 4, fill=COLOR_WHITE, stroke=COLOR_PRIMARY, line_width=2)
+        for i, v in enumerate(valores):
+            if v:
+                c.text(grid_x + i * cel + 5, y + 12, format_decimal(v), size=11, color=COLOR_DARK)
+        y += row_h + 5
+    return y
+
+
+def _page(writer):
+    c = Canvas(writer)
+    c.rect(0, 0, PAGE_W, PAGE_H, fill=COLOR_BG)
+    return c
+
+
+def draw_report(writer, relatorio, history=None):
+    """Acrescenta as duas páginas de um ``report_model.Relatorio`` ao documento de ``writer``.
+
+    ``history``: sub-histórico a exibir (padrão: ``report_view.select_history``).
+    """
+    ultima = relatorio.ultima
+    if history is None:
+        history = select_history(relatorio.historico)
+    if len(history) > HISTORY_COLUMNS:  # a grade do PDF tem colunas fixas
+        history = select_history(history, last=None, max_points=HISTORY_COLUMNS)
+
+    c = _page(writer)
+    y = _draw_header(c, relatorio)
+    c.rounded_rect(MARGIN, y, PAGE_W - 2 * MARGIN, PAGE_H - y - MARGIN, 10, stroke=COLOR_LIGHT, line_width=2)
+    y = _draw_paciente(c, relatorio, ultima, y)
+    y = _draw_normalidades(c, relatorio, ultima, y)
+    y = _draw_membros(c, ultima, y)
+    _draw_adicionais(c, ultima, y)
+    writer.add_page(c)
+
+    c = _page(writer)
+    c.rounded_rect(MARGIN, MARGIN, PAGE_W - 2 * MARGIN, PAGE_H - 2 * MARGIN, 10, stroke=COLOR_LIGHT, line_width=2)
+    _draw_historico(c, history, MARGIN)
+    writer.add_page(c)
+
+
+def pdf_fingerprint():
+    """Identifica o PDF gerado (versão do layout + imagens embutidas) fora do processo."""
+    key = (PDF_VERSION, *(getattr(asset_store.get(os.path.basename(path)), "digest", None)
+                          for path in (LOGO_PATH, CORPO_PATH)))
+    return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:16]
+
+
+def render_report_pdf(relatorio, history=None):
+    """Gera o PDF completo do relatório e devolve os bytes."""
+    with metrics.span("render.pdf"):
+        buffer = io.BytesIO()
+        writer = PdfWriter(buffer)
+        draw_report(writer, relatorio, history)
+        writer.close()
+        pdf = buffer.getvalue()
+    metrics.PAYLOAD_BYTES.observe(len(pdf), kind="pdf")
+    return pdf
@@ -0,0 +1,228 @@
+"""Serviço HTTP dos relatórios, sem Streamlit (WSGI puro, só biblioteca padrão).
+
+Rotas:
+    GET /report/{id}.html   página do relatório (``?variant=embed`` para a responsiva,
+                            ``?variant=print`` para a página A4 pronta para imprimir)
+    GET /report/{id}.pdf    PDF vetorial (``?download=1`` para baixar em vez de abrir)
+    GET /metrics            métricas do processo (formato Prometheus)
+    GET /healthz            verificação de vida
+    GET {STATIC_URL}/...    imagens e fontes com hash no nome (cache imutável)
+
+A janela do histórico vai na query string: ``last`` (número ou ``all``),
+``since``/``until`` (AAAA-MM-DD). Cada resposta tem ETag derivado da chave do
+cache de artefatos (versão dos dados + template + opções), então uma
+revalidação com ``If-None-Match`` responde 304 sem renderizar nem ler o
+artefato. Um CDN/proxy pode ficar na frente; como os relatórios têm dados de
+pacientes, o ``Cache-Control`` padrão é ``private`` (``REPORT_HTTP_CACHE_CONTROL``).
+Relatório inexistente responde 404; API da balança fora e sem cópia guardada,
+503. Com a API fora e uma cópia guardada, a cópia sai com ``no-cache`` (o
+cliente revalida na próxima vez) e ``X-Report-Status: stale``.
+
+É o mesmo ``report_engine`` das páginas Streamlit (busca, caches, template),
+e cada processo é independente; para escalar, basta um servidor WSGI com
+vários workers, que dividem os caches em disco da máquina:
+    gunicorn -w 4 --threads 8 -b 0.0.0.0:8000 report_service:app
+
+Para desenvolvimento: ``python report_service.py --port 8000``.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sys
+import uuid
+from datetime import date
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, quote
+from wsgiref.simple_server import WSGIServer, make_server
+
+import metrics
+import report_engine
+from assets import MIME_TYPES, STATIC_DIR, STATIC_URL
+from report_cache import CACHE_ERROR_TTL_SECONDS
+from report_template import CSS_VARIANTS, get_template
+
+# --- CONFIGURAÇÃO (sobrescrevível por variáveis de ambiente) ---
+CACHE_CONTROL = os.environ.get("REPORT_HTTP_CACHE_CONTROL", "private, max-age=300")
+STALE_CACHE_CONTROL = "private, no-cache"
+STATIC_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_REPORT_PATH = re.compile(r"^/report/(?P<id>[^/]+)\.(?P<ext>html|pdf)$")
+_STATIC_PREFIX = f"{STATIC_URL}/" if STATIC_URL.startswith("/") else None  # URL absoluta: servido por outro host
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# --- PARÂMETROS ---
+
+def _window(query):
+    """Janela do histórico a partir da query string (``HttpError`` 400 se inválida)."""
+    window = {}
+    last = query.get("last", [None])[0]
+    if last is not None:
+        if last == "all":
+            window["last"] = None
+        elif last.isdigit() and int(last) > 0:
+            window["last"] = int(last)
+        else:
+            raise HttpError("400 Bad Request", "last deve ser um número positivo ou 'all'")
+    for name in ("since", "until"):
+        value = query.get(name, [None])[0]
+        if value is not None:
+            try:
+                window[name] = date.fromisoformat(value)
+            except ValueError:
+                raise HttpError("400 Bad Request", f"{name} deve estar no formato AAAA-MM-DD") from None
+    return window
+
+
+def _etag_matches(header, etag):
+    """``If-None-Match`` contém ``etag`` (comparação fraca, como manda a RFC 9110)?"""
+    if not header:
+        return False
+    candidates = [candidate.strip().removeprefix("W/") for candidate in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _content_disposition(kind, filename):
+    """Nome do arquivo em ASCII e, para navegadores atuais, em UTF-8 (RFC 6266)."""
+    fallback = filename.encode("ascii", "replace").decode("ascii").replace("?", "_").replace('"', "_")
+    return f"{kind}; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename)}"
+
+
+# --- ROTAS ---
+
+def _report(environ, report_id, ext):
+    query = parse_qs(environ.get("QUERY_STRING", ""))
+    window = _window(query)
+    variant = query.get("variant", ["viewer"])[0]
+    if ext == "html" and variant not in CSS_VARIANTS:
+        raise HttpError("400 Bad Request", f"variant deve ser uma de: {', '.join(CSS_VARIANTS)}")
+
+    try:
+        report = report_engine.open_report(report_id, trace_id=metrics.current_trace_id())
+    except report_engine.ReportError as exc:
+        if exc.status == report_engine.NOT_FOUND:
+            raise HttpError("404 Not Found", "relatório não encontrado") from None
+        raise HttpError("503 Service Unavailable", "API da balança indisponível") from None
+    if ext == "html":
+        key = report_engine.html_key(report, variant, **window)
+    else:
+        key = report_engine.pdf_key(report, **window)
+    etag = f'"{hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]}"'
+    headers = [("ETag", etag)]
+    if report.status == report_engine.STALE:
+        headers += [("Cache-Control", STALE_CACHE_CONTROL), ("X-Report-Status", "stale")]
+    else:
+        headers.append(("Cache-Control", CACHE_CONTROL))
+    if _etag_matches(environ.get("HTTP_IF_NONE_MATCH"), etag):
+        return "304 Not Modified", headers, b""
+
+    if ext == "html":
+        body = report_engine.report_html(report, variant, **window)
+        headers.append(("Content-Type", "text/html; charset=utf-8"))
+    else:
+        body = report_engine.report_pdf(report, **window)
+        kind = "attachment" if query.get("download", ["0"])[0] not in ("", "0") else "inline"
+        headers.append(("Content-Type", "application/pdf"))
+        headers.append(("Content-Disposition", _content_disposition(kind, report_engine.pdf_filename(report.data))))
+    return "200 OK", headers, body
+
+
+def _static(filename):
+    """Arquivo de ``static/``; o nome tem o hash do conteúdo, então o cache é imutável."""
+    if not filename or filename != os.path.basename(filename) or filename.startswith("."):
+        raise HttpError("404 Not Found", "arquivo não encontrado")
+    try:
+        with open(os.path.join(STATIC_DIR, filename), "rb") as fp:
+            body = fp.read()
+    except OSError:
+        raise HttpError("404 Not Found", "arquivo não encontrado") from None
+    mime = MIME_TYPES.get(os.path.splitext(filename)[1].lower(), "application/octet-stream")
+    return "200 OK", [("Content-Type", mime), ("Cache-Control", STATIC_CACHE_CONTROL)], body
+
+
+def _route(environ):
+    """``(rota, status, cabeçalhos, corpo)`` da requisição."""
+    # PATH_INFO chega decodificado como latin-1 (PEP 3333); IDs podem ter UTF-8
+    path = (environ.get("PATH_INFO") or "/").encode("latin-1").decode("utf-8", "replace")
+    route = "other"
+    try:
+        if environ.get("REQUEST_METHOD", "GET") not in ("GET", "HEAD"):
+            raise HttpError("405 Method Not Allowed", "use GET")
+        match = _REPORT_PATH.match(path)
+        if match:
+            route = match["ext"]
+            return (route, *_report(environ, match["id"], match["ext"]))
+        if _STATIC_PREFIX and path.startswith(_STATIC_PREFIX):
+            route = "static"
+            return (route, *_static(path[len(_STATIC_PREFIX):]))
+        if path == "/metrics":
+            body = metrics.registry.render().encode("utf-8")
+            return ("metrics", "200 OK", [("Content-Type", "text/plain; version=0.0.4; charset=utf-8")], body)
+        if path == "/healthz":
+            return ("healthz", "200 OK", [("Content-Type", "text/plain; charset=utf-8")], b"ok\n")
+        raise HttpError("404 Not Found", "rota não encontrada")
+    except HttpError as exc:
+        return (route, *_error(exc.status, str(exc)))
+
+
+def _error(status, message):
+    headers = [("Content-Type", "text/plain; charset=utf-8"), ("Cache-Control", "no-store")]
+    if status.startswith("405"):
+        headers.append(("Allow", "GET, HEAD"))
+    elif status.startswith("503"):
+        headers.append(("Retry-After", str(int(CACHE_ERROR_TTL_SECONDS))))
+    return status, headers, f"{status}: {message}\n".encode("utf-8")
+
+
+def app(environ, start_response):
+    """Aplicação WSGI."""
+    request_id = environ.get("HTTP_X_REQUEST_ID") or ""
+    if not _REQUEST_ID.match(request_id):  # vai para logs e cabeçalhos: só aceita IDs simples
+        request_id = uuid.uuid4().hex[:16]
+    with metrics.trace(request_id), metrics.span("http.request"):
+        route, status, headers, body = _route(environ)
+    metrics.HTTP_REQUESTS.inc(route=route, status=status.split()[0])
+    headers = [*headers, ("Content-Length", str(len(body))), ("X-Request-ID", request_id)]
+    start_response(status, headers)
+    return [b""] if environ.get("REQUEST_METHOD") == "HEAD" else [body]
+
+
+def _publish_static():
+    """Compila os templates, o que grava em ``static/`` as imagens e fontes que o HTML referencia."""
+    for variant in CSS_VARIANTS:
+        get_template(variant)
+
+
+_publish_static()
+
+
+# --- SERVIDOR DE DESENVOLVIMENTO ---
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP dos relatórios (servidor de desenvolvimento).")
+    parser.add_argument("--host", default="127.0.0.1", help="endereço (padrão: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="porta (padrão: 8000)")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, app, server_class=_ThreadingWSGIServer)
+    print(f"Servindo em http://{args.host}:{args.port}/report/<id>.html", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,772 @@
+"""Template HTML do relatório pré-compilado uma vez por processo.
+
+O CSS e o esqueleto HTML são estáticos: são montados uma única vez e
+guardados como segmentos ``bytes`` imutáveis, separados por marcadores onde
+entram os valores. Renderizar um relatório é só juntar esses segmentos com os
+textos já formatados de ``report_view.build_view_model``, os SVGs do histórico
+e o título. A página sai pronta, sem JavaScript: pinta no primeiro quadro e
+pode ser guardada e servida como um documento comum. Impressa pelo navegador
+(``@media print``, ou a variante ``print``), sai em páginas A4 com o mesmo
+layout do PDF, com texto e gráficos vetoriais.
+
+Imagens e fontes não vão dentro do HTML: são referenciadas pelas URLs com
+hash de ``static/`` (ver ``assets.static_url``), então a página não depende de
+nenhum domínio externo.
+
+Benchmark: ``python report_template.py [repetições]``.
+"""
+import hashlib
+import html
+import json
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+import metrics
+from assets import ASSETS_MODE, STATIC_URL, asset_store, static_url
+from report_charts import svgs_from_matrix
+from report_model import parse_report
+from report_view import build_view_model, select_history
+
+# Incrementar sempre que o HTML/CSS gerado mudar
+TEMPLATE_VERSION = "9"
+# Idioma da página (``<html lang>`` e os textos fixos)
+LANGUAGE = "pt"
+
+# --- DEFINIÇÃO DE CORES E ESTILOS ---
+COLOR_PRIMARY = "#9e747a"
+COLOR_BG = "#f5f1f2"
+COLOR_DARK = "#72464e"
+COLOR_LIGHT = "#e2d5d7"
+
+TRANSLATIONS_PT = {
+    "titulo": "Relatório de Avaliações", "nome": "Nome: ", "estatura": "Estatura: ", "data": "Data: ",
+    "email": "E-mail: ", "sexo": "Sexo: ", "idade": "Idade: ", "analiseGlobalResumida_titulo": "Análise Global Resumida",
+    "abaixo": "Abaixo", "normal": "Normal", "acima": "Acima", "peso": "Peso", "percentualGordura": "Percentual de Gordura",
+    "massaGordura": "Massa de Gordura", "massaLivreGordura": "Massa Livre de Gordura", "aguaCorporal": "Água Corporal",
+    "imc": "IMC", "analiseMassaMagra_titulo": "Análise de Massa Magra", "analiseGordura_titulo": "Análise de Gordura",
+    "direito": "Direito", "esquerdo": "Esquerdo", "braco": "Braço", "tronco": "Tronco", "perna": "Perna",
+    "dadosAdicionais": "Dados Adicionais", "tmb": "Taxa Metabólica Basal", "ia": "Índice Apendicular",
+    "idade_metabolica": "Idade Metabólica ", "nivelGorduraVisceral": "Nível de Gordura Visceral",
+    "dadosAdicionais_impedancias": "Impedâncias Z(Ω)", "BD": "BD", "BE": "BE", "TR": "TR", "PD": "PD", "PE": "PE",
+    "historicoComposicaoCorporal": "Histórico da composição Corporal", "anos": "anos",
+    "peso_h": "Peso (kg)", "percentualGordura_h": "Percentual de Gordura (%)", "massaGordura_h": "Massa de Gordura (kg)",
+    "massaLivreGordura_h": "Massa Livre de Gordura (kg)", "massaMuscularEsqueletica_h": "Massa Muscular Esquelética (kg)",
+    "aguaCorporalL_h": "Água Corporal (L)", "aguaIntracelularL_h": "Água Intracelular (L)", "aguaExtracelularL_h": "Água Extracelular (L)",
+    "imc_h": "IMC", "areaOuNivelGorduraVisceral_h": "Área/Nível Gordura Visceral", "proteina_h": "Proteína", "minerais_h": "Minerais",
+    "massaMagraBracoDireito_h": "Massa Magra Braço Dir.", "massaMagraBracoEsquerdo_h": "Massa Magra Braço Esq.",
+    "massaMagraTronco_h": "Massa Magra Tronco", "massaMagraPernaDireita_h": "Massa Magra Perna Dir.", "massaMagraPernaEsquerda_h": "Massa Magra Perna Esq.",
+    "gorduraBracoDireito_h": "Gordura Braço Dir.", "gorduraBracoEsquerdo_h": "Gordura Braço Esq.", "gorduraTronco_h": "Gordura Tronco",
+    "gorduraPernaDireita_h": "Gordura Perna Dir.", "gorduraPernaEsquerda_h": "Gordura Perna Esq."
+}
+
+
+# Roboto sem CDN: usa a fonte instalada no sistema ou os .woff2 de fonts/
+# (publicados em static/ com hash no nome); sem nenhum dos dois, cai para Arial.
+# As fontes nunca vão em data: URI (~400 KB a mais em cada relatório).
+FONT_FILES = {
+    400: ("fonts/Roboto-Regular.woff2", ("Roboto", "Roboto-Regular")),
+    700: ("fonts/Roboto-Bold.woff2", ("Roboto Bold", "Roboto-Bold")),
+}
+STATIC_ASSETS = ("logoTKE.png", "corpo.png", *(path for path, _ in FONT_FILES.values()))
+
+
+def _font_css():
+    """``@font-face`` da Roboto apontando só para a própria aplicação."""
+    rules = []
+    for weight, (path, local_names) in FONT_FILES.items():
+        src = [f"local('{name}')" for name in local_names]
+        url = static_url(path, inline=False)
+        if url:
+            src.append(f"url('{url}') format('woff2')")
+        rules.append(
+            f"    @font-face {{ font-family: 'Roboto'; font-style: normal; font-weight: {weight}; "
+            f"font-display: swap; src: {', '.join(src)}; }}\n"
+        )
+    return "<style>\n" + "".join(rules) + "</style>\n"
+
+
+def _print_rules():
+    """Página A4 na impressão: mesmo layout do PDF (fundo até a borda, moldura a 20px) e quebras de página."""
+    return f"""
+    @page {{ size: A4; margin: 0; }}
+    html {{ -webkit-print-color-adjust: exact; print-color-adjust: exact; }}
+    body {{ background-color: {COLOR_BG}; margin: 0; padding: 0; display: block; min-height: 0; }}
+    #container {{ width: 100%; min-height: 0; margin: 0; box-shadow: none; }}
+    .header {{ margin: 0 0 10px; padding: 20px 20px 0; }}
+    .moldura {{ margin: 0 20px 20px; }}
+    .rolavel {{ overflow: visible; }}
+    .grid-container-normalidades, #charts {{ min-width: 0; }}
+    .header, .dados-paciente, .grid-container-normalidades, .membros, .grid-container-3c-dados-adicionais {{ break-inside: avoid; }}
+    .quebra-de-pagina {{ break-before: page; padding-top: 20px; }}
+    .graficos h1 {{ break-after: avoid; }}
+    #charts tr {{ break-inside: avoid; }}
+"""
+
+
+def _viewer_css(corpo_uri):
+    """CSS da página A4 aberta em nova aba (app.py / app_rsv2.py)."""
+    return f"""
+<style>
+    body {{
+        font-family: 'Roboto', Arial, sans-serif;
+        margin: 0; padding: 0;
+        background-color: #525659;
+        display: flex;
+        justify-content: center;
+        min-height: 100vh;
+    }}
+
+    #container {{
+        width: 793px;
+        min-height: 1122px;
+        margin: 30px auto;
+        background-color: {COLOR_BG};
+        padding: 0;
+        box-sizing: border-box;
+        box-shadow: 0 0 20px rgba(0,0,0,0.5);
+    }}
+
+    /* --- ESTILOS INTERNOS --- */
+    .moldura {{ border-radius: 10px; border: 2px solid {COLOR_LIGHT}; overflow: hidden; background-color: {COLOR_BG}; margin: 20px; }}
+    .container-padding-lateral {{ padding: 0px 20px; }}
+    .rolavel {{ overflow: visible; }}
+
+    h1, h2 {{ color: {COLOR_PRIMARY}; margin-bottom: 4px; }}
+    h1 {{ font-size: 20px; }}
+    h2 {{ font-size: 15px; }}
+
+    .font-p {{ font-size: 12px; }}
+    .font-m {{ font-size: 14px; }}
+    .font-g {{ font-size: 16px; }}
+    .font-bold {{ font-weight: bold; }}
+    .align-center {{ text-align: center; }}
+    .align-right {{ text-align: right; }}
+
+    /* CORPO */
+    .corpo {{ background-image: url('{corpo_uri}'); background-position: center; background-repeat: no-repeat; background-size: contain; height: 320px; }}
+    .corpo>div:nth-child(1) {{ text-align: right; }}
+    .corpo>div:nth-child(1)>div:nth-child(2) {{ margin-top: 10px; }}
+    .corpo>div:nth-child(1)>div:nth-child(3) {{ margin-top: 30px; }}
+    .corpo>div:nth-child(1)>div:nth-child(4) {{ margin-top: 63px; }}
+    .corpo>div:nth-child(2) {{ text-align: center; margin-top: 66px; }}
+    .corpo>div:nth-child(3)>div:nth-child(2) {{ margin-top: 10px; }}
+    .corpo>div:nth-child(3)>div:nth-child(3) {{ margin-top: 140px; }}
+    .lado-corpo {{ font-size: 1.2em; font-weight: bold; color: {COLOR_LIGHT}; }}
+
+    /* GRIDS */
+    .grid-container-2c {{ display: grid; grid-template-columns: 1fr 1fr; grid-gap: 10px; }}
+    .grid-container-3c {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); grid-gap: 10px; }}
+    .grid-container-3c-p {{ display: grid; grid-template-columns: 1fr 1fr 1fr; grid-gap: 10px; }}
+    .grid-container-6c {{ display: grid; grid-template-columns: repeat(11, 1fr); grid-gap: 0; }}
+    .grid-container-3c-paciente {{ display: grid; grid-template-columns: 2fr 0.8fr 0.8fr; grid-gap: 10px; }}
+    .grid-container-3c-corpo {{ display: grid; grid-template-columns: 1fr 150px 1fr; grid-gap: 10px; }}
+    .grid-container-normalidades {{ display: grid; grid-template-columns: 130px 2.3fr 1.8fr 6fr; grid-gap: 3px; }}
+    .grid-container-impedancias {{ display: grid; grid-template-columns: 55px 1fr 1fr 1fr 1fr 1fr; grid-gap: 3px; }}
+    .grid-container-3c-dados-adicionais {{ display: grid; grid-template-columns: 1fr 1fr; grid-gap: 10px; }}
+    .grid-container-dados-adicionais {{ display: grid; grid-template-columns: 106px 1fr; grid-gap: 4px; }}
+    .padding-p {{ padding: 2px 5px; }}
+
+    /* TABELAS E CORES */
+    .cel-cinza, .cel-verde {{ font-weight: bold; color: #FFF; align-items: center; display: grid; }}
+    .cel-cinza {{ background-color: {COLOR_LIGHT}; color: {COLOR_DARK}; }}
+    .cel-verde {{ background-color: {COLOR_PRIMARY}; }}
+    .cel-header {{ color: {COLOR_DARK}; font-size: 16px; font-weight: bold; text-align: center; padding: 4px; }}
+    .cel-verde.cel-header {{ color: #FFF; }}
+    .cel-label {{ color: #FFF; font-size: 13px; font-weight: bold; padding: 4px 5px; height: 41px; display: flex; align-items: center; }}
+    .cel-grafico {{ grid-column: span 3; border-top: {COLOR_DARK} 3px solid; border-left: {COLOR_DARK} 3px solid; }}
+    #valor-idade-metabolica {{ display: inline-flex; align-items: center; justify-content: center; width: 100%; }}
+
+    /* HEADER */
+    .header {{ margin-bottom: 10px; padding: 0 20px; }}
+    .logo-cel img {{ max-height: 80px; }}
+    .user-cel {{ text-align: right; color: {COLOR_DARK}; }}
+    .user-cel .nome {{ font-size: 12pt; font-weight: bold; }}
+    
+    .dados-paciente {{ background-color: {COLOR_BG}; padding: 10px 20px; border-bottom: 1px solid {COLOR_LIGHT}; }}
+    .dados-paciente .label {{ font-weight: bold; color: {COLOR_DARK}; display: inline; }}
+    .barra-baixo {{ border-bottom: 5px solid {COLOR_PRIMARY}; padding-bottom: 12px; }}
+    .barra-corpos {{ width: 5px; background-color: {COLOR_PRIMARY}; height: 334px; position: absolute; left: calc(50% - 2.5px); margin-top: 15px; }}
+
+    /* GRAFICOS */
+    .grafico-valores {{ display: grid; grid-template-columns: repeat(11, 1fr); grid-gap: 2px; }}
+    .grafico-valores>div {{ text-align: center; }}
+    .grafico-valores>div>div {{ background-color: {COLOR_DARK}; width: 2px; height: 5px; display: block; margin-left: calc(50% - 1px); }}
+    .barra-grafico-container {{ font-size: 18px; font-weight: bold; margin-top: 2px; }}
+    .barra-grafico {{ background-color: {COLOR_DARK}; height: 15px; display: inline-block; margin-right: 10px; max-width: calc(100% - 70px); }}
+    .cel-grafico-p {{ border-top: {COLOR_DARK} 1px solid; border-left: {COLOR_DARK} 1px solid; }}
+    .barra-grafico-p-container {{ font-size: 12px; font-weight: bold; margin-top: 3px; }}
+    .barra-grafico-p {{ background-color: {COLOR_DARK}; height: 7px; display: inline-block; margin-right: 10px; }}
+
+    #charts {{ width: 100%; border-collapse: separate; border-spacing: 5px; }}
+    #charts tr td:nth-child(1) {{ width: 110px; background-color: {COLOR_PRIMARY}; font-weight: bold; color: #FFF; padding: 8px; min-height: 32px; font-size: 12px; }}
+    .chartPlaceholder {{ position: absolute; width: calc(81.5% + 30px); height: 56px; overflow: hidden; left: calc(8.33% - 5px); }}
+    .graficos-tr {{ height: 38px; }}
+    .valor-label {{ border-right: dashed 2px {COLOR_LIGHT}; height: 56px; font-size: 11px; padding: 0 5px; z-index: 1000; color: {COLOR_DARK}; }}
+    .grafico-label {{ text-align: center; font-weight: bold; font-size: 11px; color: {COLOR_DARK}; background-color: {COLOR_LIGHT}; padding: 3px; }}
+    .datas {{ grid-gap: 3px; height: 20px; }}
+    .quebra-de-pagina {{ page-break-before: always; }}
+
+    @media screen and (max-width: 800px) {{
+        #container {{ width: 100%; transform: scale(0.9); transform-origin: top left; }}
+        .barra-corpos {{ display: none; }}
+    }}
+
+    @media print {{{_print_rules()}    }}
+</style>
+"""
+
+
+def _embed_css(corpo_uri):
+    """CSS responsivo do relatório embutido no Streamlit (app_reserva.py)."""
+    return f"""
+<style>
+    body {{
+        font-family: 'Roboto', Arial, sans-serif;
+        margin: 0;
+        padding: 20px;
+        background-color: {COLOR_BG}; 
+        color: {COLOR_DARK};
+        font-size: 10pt;
+        -webkit-print-color-adjust: exact !important;
+        print-color-adjust: exact !important;
+    }}
+
+    #container {{
+        width: 800px;
+        margin: auto;
+        background-color: {COLOR_BG};
+        /* position: relative; removido pois não tem mais botão absoluto */
+    }}
+
+    /* --- BASE STYLES --- */
+    .moldura {{
+        border-radius: 10px;
+        border: 2px solid {COLOR_LIGHT};
+        overflow: hidden;
+        background-color: {COLOR_BG};
+    }}
+
+    .container-padding-lateral {{ padding: 0px 20px; }}
+    .rolavel {{ overflow: auto; }}
+
+    h1, h2 {{
+        color: {COLOR_PRIMARY};
+        margin-bottom: 4px;
+    }}
+    h1 {{ font-size: 20px; }}
+    h2 {{ font-size: 15px; }}
+
+    .font-p {{ font-size: 12px; }}
+    .font-m {{ font-size: 14px; }}
+    .font-g {{ font-size: 16px; }}
+    .font-bold {{ font-weight: bold; }}
+    .align-center {{ text-align: center; }}
+    .align-right {{ text-align: right; }}
+
+    /* --- CORPO CSS --- */
+    .corpo {{
+        background-image: url('{corpo_uri}');
+        background-position: center;
+        background-repeat: no-repeat;
+        background-size: contain;
+        height: 320px;
+    }}
+    .corpo>div:nth-child(1) {{ text-align: right; }}
+    .corpo>div:nth-child(1)>div:nth-child(2) {{ margin-top: 10px; }}
+    .corpo>div:nth-child(1)>div:nth-child(3) {{ margin-top: 30px; }}
+    .corpo>div:nth-child(1)>div:nth-child(4) {{ margin-top: 63px; }}
+    .corpo>div:nth-child(2) {{ text-align: center; margin-top: 66px; }}
+    .corpo>div:nth-child(3)>div:nth-child(2) {{ margin-top: 10px; }}
+    .corpo>div:nth-child(3)>div:nth-child(3) {{ margin-top: 140px; }}
+
+    .lado-corpo {{
+        font-size: 1.2em;
+        font-weight: bold;
+        color: {COLOR_LIGHT};
+    }}
+
+    /* --- GRID CSS --- */
+    .grid-container-2c {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(300px, 1fr)); grid-gap: 10px; }}
+    .grid-container-3c {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); grid-gap: 10px; }}
+    .grid-container-3c-p {{ display: grid; grid-template-columns: 1fr 1fr 1fr; grid-gap: 10px; }}
+    .grid-container-6c {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(90px, 1fr)); grid-gap: 0; }}
+    
+    .grid-container-3c-paciente {{
+        display: grid;
+        grid-template-columns: minmax(310px, 1fr) minmax(110px, 0.4fr) minmax(110px, 0.4fr);
+        grid-gap: 10px;
+    }}
+
+    .grid-container-3c-corpo {{ display: grid; grid-template-columns: 1fr 150px 1fr; grid-gap: 10px; }}
+    
+    .grid-container-normalidades {{
+        display: grid;
+        grid-template-columns: 150px 2.3fr 1.8fr 6fr;
+        grid-gap: 3px;
+        min-width: 570px;
+    }}
+
+    .grid-container-impedancias {{ display: grid; grid-template-columns: 55px 1fr 1fr 1fr 1fr 1fr; grid-gap: 3px; }}
+    .grid-container-3c-dados-adicionais {{ display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); grid-gap: 10px; }}
+    .grid-container-dados-adicionais {{ display: grid; grid-template-columns: 106px 1fr; grid-gap: 4px; }}
+
+    .padding-p {{ padding: 2px 5px; }}
+
+    .cel-cinza, .cel-verde {{
+        font-weight: bold;
+        color: #FFF;
+        align-items: center;
+        display: grid;
+    }}
+
+    .cel-cinza {{ background-color: {COLOR_LIGHT}; color: {COLOR_DARK}; }}
+    .cel-verde {{ background-color: {COLOR_PRIMARY}; }}
+
+    .cel-header {{
+        color: {COLOR_DARK};
+        font-size: 18px;
+        font-weight: bold;
+        text-align: center;
+        padding: 4px;
+    }}
+    .cel-verde.cel-header {{ color: #FFF; }}
+
+    .cel-label {{
+        color: #FFF;
+        font-size: 14px;
+        font-weight: bold;
+        padding: 4px 10px;
+        height: 41px;
+        display: flex;
+        align-items: center;
+    }}
+
+    .cel-grafico {{
+        grid-column: span 3;
+        border-top: {COLOR_DARK} 3px solid;
+        border-left: {COLOR_DARK} 3px solid;
+    }}
+
+    #valor-idade-metabolica {{ display: inline-flex; align-items: center; justify-content: center; width: 100%; }}
+
+    /* --- STYLES GERAIS --- */
+    .header {{ margin-bottom: 10px; }}
+    .logo-cel img {{ max-height: 80px; }}
+    .user-cel {{ text-align: right; color: {COLOR_DARK}; }}
+    .user-cel .nome {{ font-size: 12pt; font-weight: bold; }}
+    
+    .dados-paciente {{
+        background-color: {COLOR_BG};
+        padding: 10px 20px;
+        border-bottom: 1px solid {COLOR_LIGHT};
+    }}
+
+    .dados-paciente .label {{
+        font-weight: bold;
+        color: {COLOR_DARK};
+        display: inline;
+    }}
+
+    .barra-baixo {{
+        border-bottom: 5px solid {COLOR_PRIMARY};
+        padding-bottom: 12px;
+    }}
+
+    .barra-corpos {{
+        width: 5px;
+        background-color: {COLOR_PRIMARY};
+        height: 334px;
+        position: absolute;
+        left: calc(50% - 2.5px);
+        margin-top: 15px;
+    }}
+
+    .grafico-valores {{
+        display: grid;
+        grid-template-columns: repeat(11, 1fr);
+        grid-gap: 2px;
+    }}
+    
+    .grafico-valores>div {{ text-align: center; }}
+    .grafico-valores>div>div {{
+        background-color: {COLOR_DARK};
+        width: 2px; height: 5px; display: block; margin-left: calc(50% - 1px);
+    }}
+
+    .barra-grafico-container {{ font-size: 20px; font-weight: bold; margin-top: 2px; }}
+    .barra-grafico {{
+        background-color: {COLOR_DARK};
+        height: 15px; display: inline-block; margin-right: 10px; max-width: calc(100% - 70px);
+    }}
+
+    .cel-grafico-p {{ border-top: {COLOR_DARK} 1px solid; border-left: {COLOR_DARK} 1px solid; }}
+    .barra-grafico-p-container {{ font-size: 12px; font-weight: bold; margin-top: 3px; }}
+    .barra-grafico-p {{ background-color: {COLOR_DARK}; height: 7px; display: inline-block; margin-right: 10px; }}
+
+    #charts {{ width: 100%; min-width: 750px; border-collapse: separate; border-spacing: 5px; }}
+    
+    #charts tr td:nth-child(1) {{
+        width: 110px;
+        background-color: {COLOR_PRIMARY};
+        font-weight: bold;
+        color: #FFF;
+        padding: 10px;
+        min-height: 32px;
+    }}
+
+    .chartPlaceholder {{
+        position: absolute;
+        width: calc(81.5% + 30px); height: 56px;
+        overflow: hidden; left: calc(8.33% - 5px);
+    }}
+
+    .graficos-tr {{ height: 38px; }}
+    .valor-label {{
+        border-right: dashed 2px {COLOR_LIGHT};
+        height: 56px; font-size: 11px; padding: 0 8px; z-index: 1000;
+        color: {COLOR_DARK};
+    }}
+
+    .grafico-label {{
+        text-align: center; font-weight: bold; font-size: 12px;
+        color: {COLOR_DARK};
+        background-color: {COLOR_LIGHT};
+        padding: 3px;
+    }}
+    .datas {{ grid-gap: 3px; height: 20px; }}
+    .quebra-de-pagina {{ page-break-before: always; }}
+
+    @media screen and (max-width: 700px) {{
+        #container {{ width: 100%; }}
+        .grid-container-normalidades {{ min-width: 100%; }}
+        .barra-corpos {{ display: none; }}
+        .grid-container-3c-paciente {{ grid-template-columns: 1fr; }}
+    }}
+
+    @media print {{{_print_rules()}    }}
+</style>
+"""
+
+
+def _print_css(corpo_uri):
+    """CSS da variante de impressão: a página A4 do visualizador já na forma impressa, também na tela."""
+    return _viewer_css(corpo_uri) + f"<style>{_print_rules()}</style>\n"
+
+
+def _t(key):
+    """Texto traduzido (no idioma do template), escapado para HTML."""
+    return html.escape(TRANSLATIONS_PT[key])
+
+
+def _slot(name):
+    """Marcador de um valor do relatório (``render`` troca pelo texto já escapado)."""
+    return f"\0{name}\0"
+
+
+def _normalidade_html(element_id, label_key):
+    return f"""
+                <div class="cel-verde cel-label">{_t(label_key)}</div>
+                <div class="cel-grafico" id="{element_id}">
+                    <div class="grafico-valores">{_slot(element_id + ".escala")}</div>
+                    <div class="barra-grafico-container"><div class="barra-grafico"{_slot(element_id + ".largura")}></div><label>{_slot(element_id + ".valor")}</label></div>
+                </div>"""
+
+
+def _membro_html(prefix, sufixo, label_key):
+    return (
+        f'<div><b>{_t(label_key)}</b><div id="{prefix}-{sufixo}-k">{_slot(f"{prefix}-{sufixo}-k")}</div>'
+        f'<div id="{prefix}-{sufixo}-p">{_slot(f"{prefix}-{sufixo}-p")}</div></div>'
+    )
+
+
+def _corpo_html(prefix, title_key):
+    return f"""
+            <div>
+                <h1>{_t(title_key)}</h1>
+                <div class="grid-container-3c-corpo corpo">
+                    <div>
+                        <div class="lado-corpo">{_t("direito")}</div>
+                        {_membro_html(prefix, "bd", "braco")}
+                        {_membro_html(prefix, "t", "tronco")}
+                        {_membro_html(prefix, "pd", "perna")}
+                    </div>
+                    <div>
+                        <div class="display-centro-corpo-k" id="{prefix}-c-k">{_slot(f"{prefix}-c-k")}</div>
+                        <div class="display-centro-corpo-p" id="{prefix}-c-p">{_slot(f"{prefix}-c-p")}</div>
+                    </div>
+                    <div>
+                        <div class="lado-corpo">{_t("esquerdo")}</div>
+                        {_membro_html(prefix, "be", "braco")}
+                        {_membro_html(prefix, "pe", "perna")}
+                    </div>
+                </div>
+            </div>"""
+
+
+def _body(logo_uri):
+    normalidades = "".join(
+        _normalidade_html(element_id, label_key)
+        for element_id, label_key in (
+            ("normalidadePeso", "peso"), ("normalidadeFMPerc", "percentualGordura"), ("normalidadeFM", "massaGordura"),
+            ("normalidadeFFM", "massaLivreGordura"), ("normalidadeTBW", "aguaCorporal"), ("normalidadeBMI", "imc"),
+        )
+    )
+    return f"""
+<div id="container">
+    <div class="header grid-container-2c">
+        <div class="logo-cel"><img src="{logo_uri}" /></div>
+        <div class="user-cel">
+            <div class="nome" id="nome">{_slot("nome")}</div>
+            <div class="endereco" id="endereco">{_slot("endereco")}</div>
+        </div>
+    </div>
+
+    <div class="moldura">
+        <div class="dados-paciente barra-baixo">
+            <div class="grid-container-3c-paciente">
+                <div><div class="label">{_t("nome")}</div><label id="paciente-nome">{_slot("paciente-nome")}</label></div>
+                <div><div class="label">{_t("estatura")}</div><label id="estatura">{_slot("estatura")}</label></div>
+                <div><div class="label">{_t("data")}</div><label id="data">{_slot("data")}</label></div>
+                <div><div class="label">{_t("email")}</div><label id="email">{_slot("email")}</label></div>
+                <div><div class="label">{_t("sexo")}</div><label id="sexo">{_slot("sexo")}</label></div>
+                <div><div class="label">{_t("idade")}</div><label id="idade">{_slot("idade")}</label></div>
+            </div>
+        </div>
+
+        <div class="container-padding-lateral rolavel barra-baixo">
+            <h1>{_t("analiseGlobalResumida_titulo")}</h1>
+            <div class="grid-container-normalidades">
+                <div class="cel-cinza cel-header"></div>
+                <div class="cel-verde cel-header">{_t("abaixo")}</div>
+                <div class="cel-cinza cel-header">{_t("normal")}</div>
+                <div class="cel-verde cel-header">{_t("acima")}</div>
+{normalidades}
+            </div>
+        </div>
+
+        <div class="barra-corpos"></div>
+
+        <div class="membros grid-container-2c barra-baixo">{_corpo_html("mm", "analiseMassaMagra_titulo")}{_corpo_html("g", "analiseGordura_titulo")}
+        </div>
+
+        <div class="container-padding-lateral">
+             <div class="grid-container-3c-dados-adicionais">
+                <div>
+                    <h2>{_t("dadosAdicionais")}</h2>
+                    <div class="grid-container-dados-adicionais">
+                        <div class="cel-cinza font-p padding-p">{_t("tmb")}</div>
+                        <div class="cel-verde align-center font-g" id="valor-taxa-metabolica-basal">{_slot("valor-taxa-metabolica-basal")}</div>
+                        <div class="cel-cinza font-p padding-p">{_t("ia")}</div>
+                        <div class="cel-verde align-center font-g" id="valor-indice-apendicular">{_slot("valor-indice-apendicular")}</div>
+                        <div class="cel-cinza font-p padding-p">{_t("idade_metabolica")}</div>
+                        <div class="cel-verde align-center font-g" id="valor-idade-metabolica">{_slot("valor-idade-metabolica")}</div>
+                    </div>
+                </div>
+                <div>
+                    <h2>{_t("nivelGorduraVisceral")}</h2>
+                    <div class="cel-cinza padding-p align-center" id="valor-vfl">{_slot("valor-vfl")}</div>
+                    <div class="grid-container-3c-p">
+                        <div class="font-p">{_t("abaixo")}</div>
+                        <div class="align-center font-bold font-m">10</div>
+                        <div class="align-right font-p">{_t("acima")}</div>
+                    </div>
+                    <div class="cel-grafico-p">
+                        <div class="barra-grafico-p-container">
+                            <div class="barra-grafico-p" id="grafico-gordura-veisceral"{_slot("grafico-gordura-veisceral")}></div>
+                        </div>
+                    </div>
+                </div>
+             </div>
+        </div>
+
+        <div class="graficos rolavel quebra-de-pagina">
+            <h1>{_t("historicoComposicaoCorporal")}</h1>
+            <table id="charts">{_slot("charts")}</table>
+        </div>
+
+    </div>
+</div>
+"""
+
+
+# --- PREENCHIMENTO (o que os antigos popular*/criarGrafico faziam no navegador) ---
+
+def _width(percent):
+    """Atributo ``style`` com a largura da barra (vazio sem valor)."""
+    return "" if percent is None else f' style="width: {percent}%"'
+
+
+def _charts_html(historico, charts):
+    """Linhas da tabela do histórico: datas e, por série, rótulo, SVG e valores."""
+    esc = html.escape
+    rows = [  # as datas no <thead>: na impressão, o cabeçalho se repete em cada página
+        '<thead><tr class="graficos-tr"><td></td><td><div class="grid-container-6c datas">'
+        + "".join(f'<div class="grafico-label">{esc(data)}</div>' for data in historico["datas"])
+        + "</div></td></tr></thead><tbody>"
+    ]
+    for key, valores in historico["series"].items():
+        rows.append(
+            f'<tr class="graficos-tr"><td><label>{_t(key)}</label></td>'
+            f'<td><div class="chartPlaceholder">{charts[key]}</div><div class="grid-container-6c">'
+            + "".join(f'<div class="valor-label">{valor}</div>' for valor in valores)  # números: sem escape
+            + "</div></td></tr>"
+        )
+    rows.append("</tbody>")
+    return "".join(rows)
+
+
+def _fill(title, view, charts):
+    """Texto (já escapado) de cada marcador do template, a partir de ``build_view_model``."""
+    esc = html.escape
+    values = {key: esc(value) for key, value in view.items() if isinstance(value, str)}
+    values["TITLE"] = esc(title)
+    values["endereco"] = "<br />".join(esc(linha) for linha in view["endereco"])
+    for element_id, barra in view["normalidades"].items():
+        values[f"{element_id}.escala"] = "".join(
+            f"<div><div></div><label>{marca}</label></div>" for marca in barra["escala"]
+        )
+        values[f"{element_id}.valor"] = esc(barra["valor"])
+        values[f"{element_id}.largura"] = _width(barra["largura"])
+    idade = view["valor-idade-metabolica"]
+    values["valor-idade-metabolica"] = "---" if idade is None else f"{esc(idade)}&nbsp;<span>{_t('anos')}</span>"
+    values["grafico-gordura-veisceral"] = _width(view["grafico-gordura-veisceral"])
+    values["charts"] = _charts_html(view["historico"], charts)
+    return values
+
+
+CSS_VARIANTS = {"viewer": _viewer_css, "embed": _embed_css, "print": _print_css}
+
+# Marcadores dos pontos onde entram os valores de cada relatório (ver ``_slot``)
+_SLOT = re.compile("\0([^\0]+)\0")
+
+
+class CompiledTemplate:
+    """Segmentos estáticos já codificados; ``render`` só intercala os valores."""
+
+    __slots__ = ("key", "fingerprint", "segments", "slots")
+
+    def __init__(self, key, source):
+        self.key = key
+        # Identifica o HTML gerado (versão, idioma, imagens...) fora do processo
+        self.fingerprint = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()[:16]
+        parts = _SLOT.split(source)  # texto, marcador, texto, marcador, ..., texto
+        self.segments = tuple(part.encode("utf-8") for part in parts[::2])
+        self.slots = tuple(parts[1::2])
+
+    def render(self, values):
+        """Junta os segmentos com os valores (já escapados) de um relatório, por marcador."""
+        out = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            out.append(values[slot].encode("utf-8"))
+            out.append(segment)
+        return b"".join(out)
+
+
+def _compile(variant, key):
+    source = (
+        f'<!DOCTYPE html>\n<html lang="{LANGUAGE}">\n<head>\n<meta charset="UTF-8">\n'
+        f"<title>Relatório - {_slot('TITLE')}</title>\n"
+        + _font_css()
+        + CSS_VARIANTS[variant](static_url("corpo.png", webp=True))
+        + "</head>\n<body>\n"
+        + _body(static_url("logoTKE.png", webp=True))
+        + "</body>\n</html>\n"
+    )
+    return CompiledTemplate(key, source)
+
+
+_templates = {}
+_lock = threading.Lock()
+
+
+def get_template(variant="viewer"):
+    """Template compilado da variante; recompila só se imagens/fontes mudarem em disco."""
+    key = (variant, TEMPLATE_VERSION, LANGUAGE, ASSETS_MODE, STATIC_URL,
+           *(getattr(asset_store.get(name), "digest", None) for name in STATIC_ASSETS))
+    template = _templates.get(variant)
+    if template is None or template.key != key:
+        with _lock:
+            template = _templates.get(variant)
+            if template is None or template.key != key:
+                with metrics.span("template.compile"):
+                    template = _templates[variant] = _compile(variant, key)
+    return template
+
+
+def to_script_json(value):
+    """JSON (UTF-8 cru, sem ``\\uXXXX``) seguro para embutir dentro de ``<script>``."""
+    return json.dumps(value, ensure_ascii=False).replace("</", "<\\/").replace("<!--", "<\\!--")
+
+
+def render_report_html(relatorio, variant="viewer", history=None):
+    """HTML completo do relatório (``report_model.Relatorio``), em bytes UTF-8.
+
+    ``history``: sub-histórico a exibir (padrão: ``report_view.select_history``).
+    """
+    nome_paciente = relatorio.paciente.nome or "Paciente"
+    if history is None:
+        history = select_history(relatorio.historico)
+    with metrics.span("render.charts"):
+        charts = svgs_from_matrix(history.valores)
+    with metrics.span("render.project"):
+        view = build_view_model(relatorio, history)
+    with metrics.span("render.fill"):
+        values = _fill(nome_paciente, view, charts)
+    template = get_template(variant)
+    with metrics.span("render.assemble"):
+        output = template.render(values)
+    metrics.PAYLOAD_BYTES.observe(len(output), kind="html")
+    return output
+
+
+# --- BENCHMARK ---
+
+def benchmark(data, repeat=200, variant="viewer"):
+    """Tempo médio e memória alocada por renderização (após a compilação)."""
+    history = select_history(data.historico)
+    values = _fill(data.paciente.nome, build_view_model(data, history), svgs_from_matrix(history.valores))
+    template = get_template(variant)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        output = template.render(values)
+    join_ms = (time.perf_counter() - started) / repeat * 1000
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render_report_html(data, variant)
+    full_ms = (time.perf_counter() - started) / repeat * 1000
+
+    tracemalloc.start()
+    render_report_html(data, variant)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "bytes": len(output),
+        "join_ms": join_ms,
+        "render_ms": full_ms,
+        "peak_alloc_kb": peak / 1024,
+    }
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    avaliacao = {
+        "data": "2024-01-01T10:00:00", "peso": 70.0, "taxaMetabolicaBasal": 1500, "idadeMetabolica": 30,
+        "dadosCorpo": {k: 20.0 for k in ("fmPercentual", "fm", "ffm", "ssm", "tbw", "icw", "ecw", "bmi", "indiceApendicular", "vfl")},
+        "dadosMembros": [{"composicaoCorporal": {"ffm": 10.0, "fm": 5.0}} for _ in range(5)],
+    }
+    amostra = {
+        "paciente": {"nome": "Paciente Exemplo", "sexo": 70, "estaturaCm": 165, "dataNascimento": "1990-01-01", "email": "a@b.c"},
+        "user": {"nome": "Clínica"},
+        "normalidades": {k: {"minimo": 10, "maximo": 30} for k in ("peso", "fmPerc", "fmKg", "ffmKg", "tbw", "bmi")},
+        "avaliacoes": [avaliacao] * 6,
+    }
+    started = time.perf_counter()
+    get_template("viewer")
+    print(f"compilação: {(time.perf_counter() - started) * 1000:.1f} ms (uma vez por processo)")
+    for nome, valor in benchmark(parse_report(amostra), repeat).items():
+        print(f"{nome}: {valor:.3f}" if isinstance(valor, float) else f"{nome}: {valor}")
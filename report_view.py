@@ -0,0 +1,160 @@
+"""Projeção do ``report_model.Relatorio`` no que a página do relatório exibe.
+
+``build_view_model`` devolve os textos prontos de cada campo da página (números
+no formato pt-BR, datas, larguras das barras), indexados pelo ``id`` do
+elemento no template; o template só os escapa e encaixa no HTML, sem
+JavaScript nenhum para preencher a página depois de carregada.
+
+O histórico passa antes por ``select_history``: uma janela (últimas N
+avaliações ou intervalo de datas) e, se ainda sobrarem mais pontos que
+``max_points``, uma redução por LTTB. Assim o número de colunas, rótulos e
+pontos dos gráficos não cresce com o histórico do paciente.
+"""
+import os
+from datetime import datetime
+
+import numpy as np
+
+from report_charts import HISTORY_SERIES, MIN_SLOTS, lttb_indices
+from report_format import (
+    calculate_age, format_date, format_decimal, format_height, format_number, format_sex, js_round,
+)
+
+# Padrões: as 11 colunas da grade do histórico (as mesmas do PDF)
+HISTORY_LAST = int(os.environ.get("REPORT_HISTORY_LAST", 11))
+HISTORY_MAX_POINTS = int(os.environ.get("REPORT_HISTORY_MAX_POINTS", 11))
+
+# Barras de normalidade: (id no template, faixa em ``Normalidades``, campo em ``Corpo``; ``None`` = peso)
+NORMALITY_BARS = (
+    ("normalidadePeso", "peso", None),
+    ("normalidadeFMPerc", "fm_perc", "fm_percentual"),
+    ("normalidadeFM", "fm_kg", "fm"),
+    ("normalidadeFFM", "ffm_kg", "ffm"),
+    ("normalidadeTBW", "tbw", "tbw"),
+    ("normalidadeBMI", "bmi", "bmi"),
+)
+NORMALITY_TICKS = 11
+# Segmentos dos bonecos: (sufixo do id no template, índice em ``membros``; ``None`` = corpo inteiro)
+LIMB_CELLS = (("bd", 0), ("be", 1), ("t", 2), ("pd", 3), ("pe", 4), ("c", None))
+
+
+def select_history(historico, last=HISTORY_LAST, since=None, until=None, max_points=HISTORY_MAX_POINTS):
+    """Sub-histórico (``report_model.Historico``) que entra no relatório.
+
+    ``since``/``until`` (``date`` ou ``datetime``, inclusivos) têm precedência
+    sobre ``last``; ``last=None`` ou ``0`` usa o histórico inteiro. Com mais de
+    ``max_points`` avaliações, mantém as escolhidas por ``lttb_indices``.
+    """
+    indices = np.arange(len(historico))
+    if since is not None or until is not None:
+        since, until = _as_date(since), _as_date(until)
+        indices = [  # avaliações sem data válida ficam de fora do intervalo
+            i for i, data in enumerate(historico.datas)
+            if data is not None
+            and (since is None or data.date() >= since)
+            and (until is None or data.date() <= until)
+        ]
+    elif last:
+        indices = indices[-last:]
+    if max_points and len(indices) > max_points:
+        indices = np.asarray(indices)[lttb_indices(historico.valores[indices], max_points)]
+    return historico.take(indices)
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+
+def build_view_model(relatorio, history=None):
+    """Textos da página por ``id`` do elemento (``history``: padrão ``select_history``).
+
+    Valores ausentes saem como os marcadores do template (``---``, ``-``),
+    nunca como ``undefined``/``NaN``.
+    """
+    if history is None:
+        history = select_history(relatorio.historico)
+    paciente, ultima = relatorio.paciente, relatorio.ultima
+    return {
+        **_usuario(relatorio.usuario),
+        "paciente-nome": paciente.nome or "",
+        "estatura": format_height(paciente.estatura_cm),
+        "data": format_date(ultima.data),
+        "email": paciente.email or "",
+        "sexo": format_sex(paciente.sexo),
+        "idade": str(calculate_age(paciente.data_nascimento, ultima.data)),
+        "normalidades": {
+            element_id: _normalidade(getattr(relatorio.normalidades, faixa),
+                                     ultima.peso if campo is None else getattr(ultima.corpo, campo))
+            for element_id, faixa, campo in NORMALITY_BARS
+        },
+        **_membros(ultima),
+        **_adicionais(ultima),
+        "historico": _historico(history),
+    }
+
+
+def _usuario(usuario):
+    """Cabeçalho: a clínica, se houver, senão o profissional; o endereço vai em duas linhas."""
+    if usuario.clinica_nome:
+        nome, endereco, complemento, cep, municipio, uf = (
+            usuario.clinica_nome, usuario.clinica_endereco, usuario.clinica_complemento,
+            usuario.clinica_cep, usuario.clinica_municipio, usuario.clinica_uf,
+        )
+    else:
+        nome, endereco, complemento, cep, municipio, uf = (
+            usuario.nome, usuario.endereco, usuario.complemento, usuario.cep, usuario.municipio, usuario.uf,
+        )
+    return {
+        "nome": nome or "",
+        "endereco": (f"{endereco or ''} {complemento or ''}", f"{cep or ''} - {municipio or ''} - {uf or ''}"),
+    }
+
+
+def _normalidade(faixa, valor):
+    """Escala de 11 marcas (a faixa normal entre a 3ª e a 5ª), valor e largura da barra (%)."""
+    minimo, maximo = faixa.minimo, faixa.maximo
+    escala, largura = [], None
+    if minimo is not None and maximo is not None:
+        passo = (maximo - minimo) / 2
+        escala = [format_number(minimo + (i - 2) * passo, 1) for i in range(NORMALITY_TICKS)]
+        if valor is not None and maximo != minimo:
+            largura = max(js_round((valor - minimo) * (41 - 23) / (maximo - minimo) + 23), 0)
+    return {"escala": escala, "valor": format_decimal(valor), "largura": largura}
+
+
+def _membros(ultima):
+    """Massa magra (``mm-*``) e gordura (``g-*``) de cada segmento, em kg e % do peso."""
+    view = {}
+    peso = ultima.peso
+    for prefixo, campo in (("mm", "ffm"), ("g", "fm")):
+        for sufixo, indice in LIMB_CELLS:
+            kg = getattr(ultima.corpo if indice is None else ultima.membro(indice), campo)
+            view[f"{prefixo}-{sufixo}-k"] = "-" if kg is None else format_decimal(kg) + "kg"
+            view[f"{prefixo}-{sufixo}-p"] = format_number(kg / peso * 100) + "%" if kg is not None and peso else "-"
+    return view
+
+
+def _adicionais(ultima):
+    corpo = ultima.corpo
+    tmb, ia, idade, vfl = ultima.taxa_metabolica_basal, corpo.indice_apendicular, ultima.idade_metabolica, corpo.vfl
+    return {
+        "valor-taxa-metabolica-basal": f"{format_number(tmb, 0)} kcal" if tmb is not None else "--- kcal",
+        "valor-indice-apendicular": f"{format_number(ia, 2)} kg/m²" if ia is not None else "---",
+        "valor-idade-metabolica": None if idade is None else f"{idade:g}",  # o template acrescenta "anos"
+        "valor-vfl": f"Nível {format_number(vfl, 0)}" if vfl is not None else "Nível",
+        "grafico-gordura-veisceral": None if vfl is None else min(max(js_round(vfl / 20 * 100), 0), 100),
+    }
+
+
+def _historico(history):
+    """Rótulos das datas e valores de cada série, com ao menos ``MIN_SLOTS`` colunas."""
+    slots = max(MIN_SLOTS, len(history))
+    padding = [""] * (slots - len(history))
+    series = history.series()
+    return {
+        "datas": [format_date(data) if data else "" for data in history.datas] + padding,
+        "series": {
+            key: [format_decimal(valor) if valor else "" for valor in series[path]] + padding
+            for path, key in HISTORY_SERIES
+        },
+    }
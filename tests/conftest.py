@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Módulos na raiz do repositório; caches em disco desligados nos testes
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("REPORT_DISK_CACHE_DIR", "")
+os.environ.setdefault("REPORT_ARTIFACT_CACHE_DIR", "")
@@ -0,0 +1,18 @@
+import metrics
+from artifact_cache import ArtifactCache
+from report_cache import ReportCache
+
+
+class _BrokenDisk:
+    def get(self, key):
+        raise OSError("disco cheio")
+
+    def put(self, key, content):
+        raise OSError("disco cheio")
+
+
+def test_disk_errors_are_counted_per_kind():
+    cache = ArtifactCache(ReportCache(ttl=float("inf")), _BrokenDisk())
+    before = metrics.ARTIFACT_REQUESTS.value(kind="pdf", result="disk_error")
+    assert cache.get_or_render("chave", lambda: b"%PDF", kind="pdf") == b"%PDF"
+    assert metrics.ARTIFACT_REQUESTS.value(kind="pdf", result="disk_error") == before + 2
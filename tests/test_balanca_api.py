@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+import balanca_api
+from balanca_api import BalancaClient, CircuitBreaker, SingleFlight
+from report_cache import ReportCache
+
+
+class _BrokenBodyResponse:
+    """Resposta cujo corpo falha ao ser lido (conexão cortada no meio do chunked)."""
+
+    status_code = 200
+
+    @property
+    def content(self):
+        raise requests.exceptions.ChunkedEncodingError("corpo truncado")
+
+
+class _FakeSession:
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+def _half_open_client(session):
+    client = BalancaClient(base_url="http://balanca.test", max_retries=0)
+    client.breaker = CircuitBreaker(threshold=1, reset_seconds=0)
+    client.breaker.record_failure()  # aberto; com reset 0, já meio-aberto
+    assert client.breaker.state == "half-open"
+    client.session = session
+    return client
+
+
+@pytest.mark.parametrize("session", [
+    _FakeSession(response=_BrokenBodyResponse()),
+    _FakeSession(error=requests.exceptions.ContentDecodingError("gzip inválido")),
+    _FakeSession(error=RuntimeError("erro inesperado")),
+])
+def test_failed_half_open_trial_is_recorded(session):
+    client = _half_open_client(session)
+    with pytest.raises(Exception):
+        client.get("Relatorio/abc")
+    # A falha da chamada de teste foi registrada: o próximo teste pode seguir
+    assert client.breaker.allow()
+    client.breaker.record_success()
+    assert client.breaker.state == "closed"
+
+
+def test_half_open_allows_a_single_trial():
+    breaker = CircuitBreaker(threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.allow()
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_single_flight_runs_once_for_concurrent_callers():
+    flights, calls, gate = SingleFlight(), [], threading.Event()
+
+    def fetch():
+        calls.append(1)
+        gate.wait(5)
+        return "dados"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("abc", fetch))) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    _wait_until(lambda: len(calls) == 1)
+    time.sleep(0.05)  # dá tempo às outras threads de entrarem na mesma chamada
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 9
+    assert {value for value, _ in results} == {"dados"}
+
+
+def test_single_flight_shares_the_error():
+    flights = SingleFlight()
+    with pytest.raises(ValueError):
+        flights.do("abc", lambda: (_ for _ in ()).throw(ValueError("falhou")))
+    assert flights.in_flight() == 0
+    assert flights.do("abc", lambda: 1) == (1, False)
+
+
+class _SlowClient:
+    body = json.dumps({"paciente": {"nome": "Ana"}, "avaliacoes": []}).encode()
+
+    def __init__(self):
+        self.calls = 0
+        self.gate = threading.Event()
+
+    def get(self, path, headers=None):
+        self.calls += 1
+        self.gate.wait(5)
+        return type("Response", (), {"status_code": 200, "headers": {}, "content": self.body})()
+
+
+def test_background_refresh_and_cold_miss_share_one_request(monkeypatch):
+    client = _SlowClient()
+    monkeypatch.setattr(balanca_api, "client", client)
+    monkeypatch.setattr(balanca_api, "report_cache", ReportCache())
+    monkeypatch.setattr(balanca_api, "disk_cache", None)
+    balanca_api._schedule_refresh("abc")
+    _wait_until(lambda: client.calls == 1)
+    miss = threading.Thread(target=balanca_api.fetch_report, args=("abc",))
+    miss.start()
+    time.sleep(0.05)
+    client.gate.set()
+    miss.join()
+    _wait_until(lambda: not balanca_api._refreshing)
+    assert client.calls == 1
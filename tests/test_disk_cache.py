@@ -0,0 +1,72 @@
+import json
+import time
+
+import pytest
+
+import balanca_api
+from disk_cache import DiskCache
+from report_cache import ReportCache
+
+BODY = json.dumps({"paciente": {"nome": "Ana"}, "avaliacoes": []}).encode()
+
+
+class _Response:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = BODY if status_code == 200 else b""
+
+
+class _FakeClient:
+    def __init__(self):
+        self.requests = []
+
+    def get(self, path, headers=None):
+        self.requests.append(headers or {})
+        if headers and headers.get("If-None-Match") == '"v1"':
+            return _Response(304)
+        return _Response(200, {"ETag": '"v1"'})
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path):
+    client = _FakeClient()
+    cache = ReportCache()
+    disk = DiskCache(str(tmp_path))
+    monkeypatch.setattr(balanca_api, "client", client)
+    monkeypatch.setattr(balanca_api, "report_cache", cache)
+    monkeypatch.setattr(balanca_api, "disk_cache", disk)
+    # Toda cópia em disco já está vencida e fora da janela stale: revalida na hora
+    monkeypatch.setattr(balanca_api, "DISK_CACHE_FRESH_SECONDS", 0)
+    monkeypatch.setattr(balanca_api, "DISK_CACHE_STALE_SECONDS", 0)
+    return client, cache, disk
+
+
+def test_expired_copy_is_revalidated_with_its_etag(api):
+    client, cache, disk = api
+    first = balanca_api.fetch_report("abc")
+    stored_at = disk.get("abc").stored_at
+    cache.clear()
+    time.sleep(0.01)
+
+    before = time.time()
+    again = balanca_api.fetch_report("abc")
+    assert client.requests[-1] == {"If-None-Match": '"v1"'}
+    assert again.status == balanca_api.FRESH
+    assert again.version == first.version
+    assert again.fetched_at >= before
+    assert disk.get("abc").stored_at > stored_at
+
+
+def test_revalidated_copy_is_fresh_even_if_the_disk_is_read_only(api, monkeypatch):
+    client, cache, disk = api
+    balanca_api.fetch_report("abc")
+    cache.clear()
+
+    def read_only(key, entry):
+        raise OSError("somente leitura")
+
+    monkeypatch.setattr(disk, "touch", read_only)
+    time.sleep(0.01)
+    before = time.time()
+    assert balanca_api.fetch_report("abc").fetched_at >= before
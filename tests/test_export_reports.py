@@ -0,0 +1,43 @@
+import io
+import zipfile
+
+import export_reports
+from export_reports import read_report_ids
+
+
+def test_bare_fragments_are_ids_and_skipped_lines_are_logged():
+    source = io.StringIO(
+        "# turma da manhã\n"
+        "#\n"
+        "https://relatorio.example/#abc\n"
+        "#def\n"
+        "\n"
+        "ghi\n"
+        "https://relatorio.example/#\n"
+        "abc\n"
+    )
+    log = io.StringIO()
+    assert read_report_ids(source, log=log) == ["abc", "def", "ghi"]
+    assert log.getvalue().splitlines() == [
+        "linha 7 ignorada (sem ID): https://relatorio.example/#",
+        "linha 8 ignorada (ID repetido): abc",
+    ]
+
+
+def _build_pdf(report_id):
+    if report_id == "ruim":
+        raise LookupError("relatório não encontrado")
+    return "Ana.pdf", f"%PDF {report_id}".encode()
+
+
+def test_cli_writes_a_zip_and_reports_failures(monkeypatch, tmp_path):
+    monkeypatch.setattr(export_reports, "build_pdf", _build_pdf)
+    entrada = tmp_path / "links.txt"
+    entrada.write_text("#abc\nruim\ndef\n", encoding="utf-8")
+    saida = tmp_path / "relatorios.zip"
+
+    assert export_reports.main([str(entrada), "-o", str(saida), "--workers", "2"]) == 1
+    with zipfile.ZipFile(saida) as zf:
+        # Mesmo nome de paciente: o segundo a ficar pronto ganha o ID no nome
+        assert len(zf.namelist()) == 2 and "Ana.pdf" in zf.namelist()
+        assert {zf.read(name) for name in zf.namelist()} == {b"%PDF abc", b"%PDF def"}
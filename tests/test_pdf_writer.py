@@ -0,0 +1,21 @@
+import struct
+import zlib
+
+from pdf_writer import load_png
+
+
+def _png(width, height):
+    def chunk(ctype, body):
+        return struct.pack(">I", len(body)) + ctype + body + struct.pack(">I", zlib.crc32(ctype + body))
+    rows = b"".join(b"\x00" + b"\x80" * (3 * width) for _ in range(height))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+
+def test_replacing_the_image_invalidates_the_decoded_png(tmp_path):
+    path = tmp_path / "logo.png"
+    path.write_bytes(_png(2, 3))
+    assert load_png(str(path))[:2] == (2, 3)
+    assert load_png(str(path)) is load_png(str(path))
+    path.write_bytes(_png(5, 4))
+    assert load_png(str(path))[:2] == (5, 4)
@@ -0,0 +1,36 @@
+import threading
+
+import prefetch
+from prefetch import PrefetchQueue
+
+
+def test_queue_warms_each_id_once_and_records_failures():
+    warmed, gate = [], threading.Event()
+
+    def warm(report_id):
+        gate.wait(5)
+        warmed.append(report_id)
+        if report_id == "ruim":
+            raise LookupError("relatório não encontrado")
+
+    fila = PrefetchQueue(workers=2, warm=warm)
+    assert fila.submit(["abc", "def", "abc", "", "ruim"]) == 3
+    assert fila.submit(["def"]) == 0  # ainda na fila ou em andamento
+    gate.set()
+    fila.join()
+    assert sorted(warmed) == ["abc", "def", "ruim"]
+    stats = fila.stats()
+    assert (stats["done"], stats["failed"], stats["queued"], stats["running"]) == (2, 1, 0, 0)
+    assert [report_id for report_id, _ in fila.failures] == ["ruim"]
+
+
+def test_cli_exits_non_zero_when_a_report_fails(monkeypatch, tmp_path, capsys):
+    def warm(report_id):
+        if report_id == "ruim":
+            raise LookupError("relatório não encontrado")
+
+    monkeypatch.setattr(prefetch, "prefetch_queue", PrefetchQueue(warm=warm))
+    agenda = tmp_path / "agenda.txt"
+    agenda.write_text("# consultas de hoje\nabc\n#ruim\n", encoding="utf-8")
+    assert prefetch.main([str(agenda), "--workers", "2"]) == 1
+    assert "Pré-carregados: 1/2" in capsys.readouterr().err
@@ -0,0 +1,88 @@
+import json
+import time
+
+import pytest
+import requests
+
+import balanca_api
+from report_cache import ReportCache
+
+BODY = json.dumps({"paciente": {"nome": "Ana"}, "avaliacoes": []}).encode()
+
+
+class _Response:
+    status_code = 200
+    headers = {}
+    content = BODY
+
+
+class _FakeClient:
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+
+    def get(self, path, headers=None):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return _Response()
+
+
+@pytest.fixture
+def api(monkeypatch):
+    client = _FakeClient()
+    cache = ReportCache(ttl=0.05, stale=60)
+    monkeypatch.setattr(balanca_api, "client", client)
+    monkeypatch.setattr(balanca_api, "report_cache", cache)
+    monkeypatch.setattr(balanca_api, "disk_cache", None)
+    return client, cache
+
+
+def _wait_refresh():
+    deadline = time.monotonic() + 5
+    while balanca_api._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_miss_is_counted_once(api):
+    client, cache = api
+    assert balanca_api.fetch_report("abc").status == balanca_api.FRESH
+    assert client.calls == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_expired_memory_entry_is_served_and_refreshed(api):
+    client, cache = api
+    first = balanca_api.fetch_report("abc")
+    time.sleep(0.06)
+    served = balanca_api.fetch_report("abc")
+    assert served.status == balanca_api.REVALIDATING
+    assert served.data is first.data
+    _wait_refresh()
+    assert client.calls == 2
+    assert balanca_api.fetch_report("abc").status == balanca_api.FRESH
+    assert client.calls == 2
+
+
+def test_failed_refresh_keeps_the_copy_as_stale(api):
+    client, cache = api
+    first = balanca_api.fetch_report("abc")
+    time.sleep(0.06)
+    client.error = requests.exceptions.ConnectionError("fora do ar")
+    balanca_api.fetch_report("abc")
+    _wait_refresh()
+    kept = balanca_api.fetch_report("abc")
+    assert kept.status == balanca_api.STALE
+    assert kept.data is first.data
+    assert cache.stats()["bytes"] == len(BODY)
+
+
+def test_reads_in_the_stale_window_count_one_expiration():
+    cache = ReportCache(ttl=0.01, stale=60)
+    cache.put("abc", "valor", 5)
+    time.sleep(0.02)
+    for _ in range(3):
+        assert cache.get("abc") is None
+        assert cache.lookup("abc") == ("valor", True)
+    stats = cache.stats()
+    assert (stats["expirations"], stats["stale"], stats["misses"], stats["hits"]) == (1, 6, 0, 0)
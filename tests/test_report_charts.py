@@ -0,0 +1,25 @@
+import numpy as np
+
+from report_charts import lttb_indices
+
+
+def test_lttb_keeps_the_endpoints_and_the_threshold():
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(500, 9))
+    indices = lttb_indices(matrix, 50)
+    assert len(indices) == 50
+    assert indices[0] == 0 and indices[-1] == 499
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_keeps_a_spike():
+    matrix = np.zeros((100, 1))
+    matrix[37] = 10
+    assert 37 in lttb_indices(matrix, 10)
+
+
+def test_lttb_tolerates_gaps_and_short_histories():
+    matrix = np.full((20, 2), np.nan)
+    matrix[::3, 0] = np.arange(7)
+    assert lttb_indices(matrix, 5).tolist()[::4] == [0, 19]
+    assert lttb_indices(matrix, 50).tolist() == list(range(20))
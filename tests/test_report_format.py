@@ -0,0 +1,24 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from report_format import format_date, parse_date
+
+
+@pytest.fixture
+def sao_paulo(monkeypatch):
+    monkeypatch.setenv("TZ", "America/Sao_Paulo")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_utc_dates_are_shown_in_the_server_time_zone(sao_paulo):
+    assert format_date(parse_date("2024-08-08T01:37:00Z")) == "07/08/2024 22:37"
+
+
+def test_naive_dates_are_already_local(sao_paulo):
+    assert format_date(datetime(2024, 8, 8, 1, 37)) == "08/08/2024 01:37"
+    assert format_date(None) == ""
@@ -0,0 +1,47 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from report_model import parse_report
+from report_template import render_report_html
+from report_pdf import render_report_pdf
+
+
+def _payload(nascimento, data):
+    return {
+        "paciente": {"nome": "Ana", "dataNascimento": nascimento},
+        "avaliacoes": [{"data": data, "peso": 70}],
+    }
+
+
+def test_iso_dates_are_parsed_once():
+    relatorio = parse_report(_payload("1985-04-12", "2024-08-08T10:37:00Z"))
+    assert relatorio.paciente.data_nascimento == datetime(1985, 4, 12)
+    assert relatorio.ultima.data == datetime(2024, 8, 8, 10, 37, tzinfo=timezone.utc)
+    assert relatorio.historico.datas == (relatorio.ultima.data,)
+
+
+def test_invalid_dates_become_none_and_still_render():
+    relatorio = parse_report(_payload("12/04/1985", "ontem"))
+    assert relatorio.paciente.data_nascimento is None
+    assert relatorio.ultima.data is None
+    assert relatorio.historico.datas == (None,)
+    assert b'<label id="idade"></label>' in render_report_html(relatorio)
+    assert render_report_pdf(relatorio).startswith(b"%PDF")
+
+
+def test_age_is_computed_at_the_evaluation_date():
+    # Aniversário depois da avaliação: a idade não muda com a data de hoje
+    relatorio = parse_report(_payload("1985-09-01", "2024-08-08T10:37:00Z"))
+    assert b'<label id="idade">38</label>' in render_report_html(relatorio)
+
+
+def test_comma_decimals_are_kept_in_the_history():
+    relatorio = parse_report({"avaliacoes": [
+        {"data": "2024-07-08T10:00:00Z", "peso": "70,5", "dadosCorpo": {"bmi": "22,1"}},
+        {"data": "2024-08-08T10:00:00Z", "peso": 71, "dadosCorpo": {"bmi": "texto"}},
+    ]})
+    assert relatorio.ultima.peso == 71
+    assert relatorio.historico.valores[:, 0].tolist() == [70.5, 71.0]
+    bmi = relatorio.historico.valores[:, -1]
+    assert bmi[0] == 22.1 and np.isnan(bmi[1])
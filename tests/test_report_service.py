@@ -0,0 +1,79 @@
+import io
+import json
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+import requests
+
+import balanca_api
+import report_service
+from report_cache import ReportCache
+
+BODY = json.dumps({"paciente": {"nome": "Ana"}, "avaliacoes": [{"data": "2024-08-08T10:37:00Z", "peso": 70}]}).encode()
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.headers = {}
+        self.content = BODY if status_code == 200 else b""
+
+
+class _FakeClient:
+    def get(self, path, headers=None):
+        if path.endswith("/abc"):
+            return _Response(200)
+        response = _Response(404)
+        raise requests.exceptions.HTTPError(response=response)
+
+
+@pytest.fixture(autouse=True)
+def api(monkeypatch):
+    monkeypatch.setattr(balanca_api, "client", _FakeClient())
+    monkeypatch.setattr(balanca_api, "report_cache", ReportCache())
+    monkeypatch.setattr(balanca_api, "disk_cache", None)
+
+
+def _get(path, query="", **headers):
+    environ = {"PATH_INFO": path, "QUERY_STRING": query, "wsgi.input": io.BytesIO()}
+    environ.update({f"HTTP_{name.upper()}": value for name, value in headers.items()})
+    setup_testing_defaults(environ)
+    response = {}
+
+    def start_response(status, response_headers):
+        response["status"], response["headers"] = status, dict(response_headers)
+
+    body = b"".join(report_service.app(environ, start_response))
+    return response["status"], response["headers"], body
+
+
+@pytest.mark.parametrize("path, content_type", [
+    ("/report/abc.html", "text/html; charset=utf-8"),
+    ("/report/abc.pdf", "application/pdf"),
+])
+def test_report_is_served(path, content_type):
+    status, headers, body = _get(path)
+    assert status == "200 OK"
+    assert headers["Content-Type"] == content_type
+    assert headers["ETag"] and body
+
+
+def test_if_none_match_answers_304_without_a_body():
+    etag = _get("/report/abc.html")[1]["ETag"]
+    status, headers, body = _get("/report/abc.html", if_none_match=f'W/{etag}, "outro"')
+    assert status == "304 Not Modified"
+    assert headers["ETag"] == etag and body == b""
+    assert _get("/report/abc.html", query="variant=embed", if_none_match=etag)[0] == "200 OK"
+
+
+@pytest.mark.parametrize("path, query, expected", [
+    ("/report/nao-existe.html", "", "404"),
+    ("/report/abc.html", "variant=outra", "400"),
+    ("/report/abc.html", "last=-1", "400"),
+    ("/report/abc.pdf", "since=08/08/2024", "400"),
+    ("/outra/rota", "", "404"),
+])
+def test_errors(path, query, expected):
+    status, headers, _ = _get(path, query)
+    assert status.split()[0] == expected
+    assert headers["Cache-Control"] == "no-store"
@@ -0,0 +1,18 @@
+import assets
+import report_template
+
+
+def test_fonts_are_never_inlined(monkeypatch):
+    monkeypatch.setattr(assets, "ASSETS_MODE", "inline")
+    css = report_template._font_css()
+    assert "data:" not in css
+    assert "local('Roboto')" in css
+
+
+def test_fonts_fall_back_to_local_when_static_is_read_only(monkeypatch):
+    def read_only(*args, **kwargs):
+        raise OSError("somente leitura")
+
+    monkeypatch.setattr(assets.asset_store, "publish", read_only)
+    css = report_template._font_css()
+    assert "data:" not in css and "url(" not in css